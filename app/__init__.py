@@ -20,6 +20,76 @@ def create_app():
     # JWT Configuration
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     
+    # Cola de procesamiento de videos
+    app.config['VIDEO_WORKERS'] = int(os.environ.get('VIDEO_WORKERS', 2))
+    app.config['JOB_LEASE_SECONDS'] = int(os.environ.get('JOB_LEASE_SECONDS', 120))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', 5))
+    # Límite global de procesos ffmpeg y cortes paralelos por video (0 = núcleos disponibles)
+    app.config['FFMPEG_CONCURRENCY'] = int(os.environ.get('FFMPEG_CONCURRENCY', 0))
+    app.config['CLIP_WORKERS'] = int(os.environ.get('CLIP_WORKERS', 0))
+    # Límite global de procesos hijos (yt-dlp, ffmpeg, ffprobe) por proceso (0 = 2 por núcleo)
+    app.config['MAX_CHILD_PROCESSES'] = int(os.environ.get('MAX_CHILD_PROCESSES', 0))
+    # Hilos totales a repartir en partes fijas entre los encodes que pueden correr a la vez (0 = núcleos)
+    app.config['ENCODE_THREADS'] = int(os.environ.get('ENCODE_THREADS', 0))
+    # smart = cortes exactos (copia de GOPs + bordes recodificados); copy = sólo -c copy
+    app.config['CLIP_CUT_MODE'] = os.environ.get('CLIP_CUT_MODE', 'smart')
+    # single_pass = un solo ffmpeg con seek en la entrada; per_clip = un ffmpeg por clip.
+    # Con CLIP_CUT_MODE=smart los cortes sin recodificar son exactos y van siempre por
+    # clip: este modo sólo elige cómo se cortan los clips con perfil o subtítulos
+    app.config['CLIP_EXTRACTION_MODE'] = os.environ.get('CLIP_EXTRACTION_MODE', 'single_pass')
+    # Vistas previas extra por clip además del thumbnail: sprite, preview (WebP animado)
+    app.config['THUMBNAIL_EXTRAS'] = [
+        extra.strip() for extra in os.environ.get('THUMBNAIL_EXTRAS', '').split(',') if extra.strip()
+    ]
+    # Límite de las variantes redimensionadas de thumbnails (0 = sin límite)
+    app.config['THUMBNAIL_CACHE_MAX_BYTES'] = int(os.environ.get('THUMBNAIL_CACHE_MAX_BYTES', 512 * 1024 ** 2))
+    # Caché de medios compartida (0 = sin límite de tamaño)
+    app.config['MEDIA_CACHE_DIR'] = os.environ.get('MEDIA_CACHE_DIR', os.path.join('uploads', 'cache'))
+    app.config['MEDIA_CACHE_MAX_BYTES'] = int(os.environ.get('MEDIA_CACHE_MAX_BYTES', 10 * 1024 ** 3))
+    # full = video completo; sections = sólo las ventanas de los clips (requiere library)
+    app.config['DOWNLOAD_MODE'] = os.environ.get('DOWNLOAD_MODE', 'sections')
+    # Planificador de clips: uniform | energy (audio con NumPy); scenes agrega cambios de escena
+    app.config['CLIP_PLANNER'] = os.environ.get('CLIP_PLANNER', 'energy')
+    app.config['CLIP_PLANNER_SCENES'] = os.environ.get('CLIP_PLANNER_SCENES', 'false').lower() == 'true'
+    # Con DOWNLOAD_MODE=full, videos con duración >= este valor (segundos) analizan
+    # el audio primero (0 = nunca); con sections el audio se analiza siempre
+    app.config['AUDIO_FIRST_MIN_DURATION'] = int(os.environ.get('AUDIO_FIRST_MIN_DURATION', 1200))
+    # library = yt-dlp en el mismo proceso; subprocess = binario yt-dlp
+    app.config['YTDLP_BACKEND'] = os.environ.get('YTDLP_BACKEND', 'library')
+    # Tiempo máximo de cada descarga de yt-dlp, librería o binario (segundos)
+    app.config['DOWNLOAD_TIMEOUT'] = int(os.environ.get('DOWNLOAD_TIMEOUT', 900))
+    # Caché de metadatos de yt-dlp (segundos; negativa = videos no disponibles)
+    app.config['VIDEO_INFO_TTL'] = int(os.environ.get('VIDEO_INFO_TTL', 86400))
+    app.config['VIDEO_INFO_NEGATIVE_TTL'] = int(os.environ.get('VIDEO_INFO_NEGATIVE_TTL', 600))
+    app.config['VIDEO_INFO_CACHE_SIZE'] = int(os.environ.get('VIDEO_INFO_CACHE_SIZE', 1024))
+    # Transcripción: whisper | stub | none
+    app.config['TRANSCRIPTION_BACKEND'] = os.environ.get('TRANSCRIPTION_BACKEND', 'whisper')
+    app.config['WHISPER_MODEL'] = os.environ.get('WHISPER_MODEL', 'base')
+    app.config['TRANSCRIPTION_LANGUAGE'] = os.environ.get('TRANSCRIPTION_LANGUAGE') or None
+    app.config['TRANSCRIPTION_CHUNK_SECONDS'] = int(os.environ.get('TRANSCRIPTION_CHUNK_SECONDS', 30))
+    app.config['TRANSCRIPTION_BATCH_SIZE'] = int(os.environ.get('TRANSCRIPTION_BATCH_SIZE', 8))
+    # Quemar subtítulos en el video del clip (además de los archivos SRT/VTT)
+    app.config['CAPTION_BURN_IN'] = os.environ.get('CAPTION_BURN_IN', 'false').lower() == 'true'
+    # Cada cuánto los workers guardan el progreso y los streams SSE consultan la base (segundos)
+    app.config['PROGRESS_FLUSH_INTERVAL'] = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 2))
+    app.config['PROGRESS_POLL_INTERVAL'] = float(os.environ.get('PROGRESS_POLL_INTERVAL', 2))
+    # Duración máxima de un stream SSE antes de que el cliente se reconecte (segundos)
+    app.config['PROGRESS_STREAM_SECONDS'] = int(os.environ.get('PROGRESS_STREAM_SECONDS', 300))
+    # Streams SSE y long-polls en espera a la vez por proceso; cada uno ocupa un hilo de gunicorn (0 = sin límite)
+    app.config['PROGRESS_MAX_STREAMS'] = int(os.environ.get('PROGRESS_MAX_STREAMS', 4))
+    # Máximo de videos por envío en lote o playlist
+    app.config['BATCH_MAX_VIDEOS'] = int(os.environ.get('BATCH_MAX_VIDEOS', 100))
+    # Segundos que cada proceso reutiliza el snapshot de /admin/stats
+    app.config['STATS_CACHE_SECONDS'] = int(os.environ.get('STATS_CACHE_SECONDS', 30))
+    # Cada cuánto los workers recalculan los agregados diarios de hoy y ayer (0 = nunca)
+    app.config['ROLLUP_INTERVAL'] = int(os.environ.get('ROLLUP_INTERVAL', 600))
+    # Paginación por cursor de las colecciones (?limit= se acota a PAGE_SIZE_MAX)
+    app.config['PAGE_SIZE_DEFAULT'] = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    app.config['PAGE_SIZE_MAX'] = int(os.environ.get('PAGE_SIZE_MAX', 200))
+    # false = el procesamiento sólo corre en procesos `worker` dedicados
+    app.config['EMBEDDED_WORKERS'] = os.environ.get('EMBEDDED_WORKERS', 'true').lower() == 'true'
+    
     # Configurar CORS para permitir todas las conexiones
     CORS(app, resources={
         r"/*": {
@@ -35,7 +105,7 @@ def create_app():
     migrate.init_app(app, db)
     
     # Importar modelos
-    from .models import User, Video, Clip
+    from .models import User, Video, Clip, ProcessingJob, VideoInfoCache, Transcript, StatCounter, DailyRollup
     
     # Registrar blueprints
     from .auth.routes import auth_bp
@@ -84,4 +154,23 @@ def create_app():
     with app.app_context():
         db.create_all()
     
+    # Contadores de /admin/stats y comando `flask stats-rebuild`
+    from .admin import stats
+    from .admin.rollups import rollup_command
+    stats.init_app(app)
+    app.cli.add_command(rollup_command)
+    
+    # Límite de procesos hijos del supervisor
+    from .videos import supervisor
+    supervisor.configure(app.config['MAX_CHILD_PROCESSES'])
+    
+    # Hilos de cada encode (se fija aquí: los cortes en paralelo no tienen contexto de app)
+    from .videos import encoding
+    encoding.configure(app.config['ENCODE_THREADS'], encoding.expected_encodes(app.config))
+    
+    # Comando `flask worker` para correr el pool fuera de gunicorn; el pool
+    # embebido lo inicia wsgi.py, así los comandos `flask` no reclaman trabajos
+    from .videos.jobs import worker_command
+    app.cli.add_command(worker_command)
+    
     return app 
\ No newline at end of file
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, date
+from flask.cli import with_appcontext
+from .. import db
+from ..models import User, Video, Clip, ProcessingJob, DailyRollup
+from .stats import upsert_insert
+import click
+
+# Agregados diarios por plan para las analíticas de admin.
+#
+# Cada día (UTC) se recalcula completo desde las tablas, acotado por
+# created_at/updated_at con sus índices, y se escribe con un upsert por
+# (día, plan): el job es idempotente y dos workers que recalculan el mismo
+# día a la vez no chocan con la restricción única. Los
+# workers recalculan hoy y ayer periódicamente (los trabajos que terminan
+# pasada la medianoche); `flask rollup --days N` rellena el historial.
+#
+# El plan es el actual del usuario, no el que tenía ese día.
+
+METRICS = ('signups', 'submissions', 'completions', 'failures', 'clips', 'processing_seconds')
+
+def day_bounds(day):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+def compute_day(day):
+    """Métricas de un día agrupadas por plan"""
+    start, end = day_bounds(day)
+    rows = {}
+
+    def add(plan, metric, value):
+        plan = plan or 'free'
+        rows.setdefault(plan, dict.fromkeys(METRICS, 0))
+        rows[plan][metric] += value or 0
+
+    signups = db.session.query(User.plan, db.func.count(User.id)).filter(
+        User.created_at >= start, User.created_at < end
+    ).group_by(User.plan)
+    for plan, count in signups:
+        add(plan, 'signups', count)
+
+    submissions = db.session.query(User.plan, db.func.count(Video.id)).join(User, User.id == Video.user_id).filter(
+        Video.created_at >= start, Video.created_at < end
+    ).group_by(User.plan)
+    for plan, count in submissions:
+        add(plan, 'submissions', count)
+
+    clips = db.session.query(User.plan, db.func.count(Clip.id)).join(Video, Video.id == Clip.video_id)\
+        .join(User, User.id == Video.user_id).filter(
+            Clip.created_at >= start, Clip.created_at < end
+        ).group_by(User.plan)
+    for plan, count in clips:
+        add(plan, 'clips', count)
+
+    # Trabajos terminados ese día; la duración se calcula aquí para no
+    # depender de la aritmética de fechas de cada motor
+    finished = db.session.query(
+        User.plan, ProcessingJob.status, ProcessingJob.started_at, ProcessingJob.updated_at
+    ).join(User, User.id == ProcessingJob.user_id).filter(
+        ProcessingJob.status.in_(('completed', 'failed')),
+        ProcessingJob.updated_at >= start,
+        ProcessingJob.updated_at < end
+    )
+    for plan, status, started_at, finished_at in finished:
+        add(plan, 'completions' if status == 'completed' else 'failures', 1)
+        if started_at and finished_at and finished_at > started_at:
+            add(plan, 'processing_seconds', (finished_at - started_at).total_seconds())
+
+    return rows
+
+def rollup_day(day):
+    """Recalcular y reemplazar las filas de un día"""
+    rows = compute_day(day)
+    table = DailyRollup.__table__
+    now = datetime.utcnow()
+    connection = db.session.connection()
+    insert = upsert_insert(connection.dialect.name)
+
+    for plan, metrics in sorted(rows.items()):
+        values = dict(metrics, processing_seconds=round(metrics['processing_seconds'], 1), updated_at=now)
+        if insert:
+            stmt = insert(table).values(day=day, plan=plan, **values)
+            connection.execute(stmt.on_conflict_do_update(index_elements=['day', 'plan'], set_=values))
+            continue
+        result = connection.execute(
+            table.update().where(table.c.day == day, table.c.plan == plan).values(**values)
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(day=day, plan=plan, **values))
+
+    # Planes que ya no tienen actividad ese día (usuarios que cambiaron de plan)
+    stale = table.delete().where(table.c.day == day)
+    if rows:
+        stale = stale.where(table.c.plan.notin_(list(rows)))
+    connection.execute(stale)
+    db.session.commit()
+    return len(rows)
+
+def rollup_recent(days=2):
+    """Recalcular los últimos días (hoy incluido)"""
+    today = datetime.utcnow().date()
+    for offset in range(days):
+        rollup_day(today - timedelta(days=offset))
+
+def series(start, end, plan=None):
+    """Serie diaria entre start y end (inclusive) leída sólo de los agregados"""
+    query = DailyRollup.query.filter(DailyRollup.day >= start, DailyRollup.day <= end)
+    if plan:
+        query = query.filter(DailyRollup.plan == plan)
+
+    days = {}
+    for row in query.order_by(DailyRollup.day):
+        entry = days.setdefault(row.day, {'by_plan': {}, **dict.fromkeys(METRICS, 0)})
+        data = row.to_dict()
+        entry['by_plan'][row.plan] = {metric: data[metric] for metric in METRICS}
+        for metric in METRICS:
+            entry[metric] += data[metric] or 0
+
+    # Días sin actividad en cero para que la serie no tenga huecos
+    result = []
+    day = start
+    while day <= end:
+        entry = days.get(day, {'by_plan': {}, **dict.fromkeys(METRICS, 0)})
+        entry['processing_seconds'] = round(entry['processing_seconds'], 1)
+        result.append({'day': day.isoformat(), **entry})
+        day += timedelta(days=1)
+    return result
+
+@click.command('rollup')
+@click.option('--days', type=int, default=2, help='Cantidad de días hacia atrás a recalcular')
+@with_appcontext
+def rollup_command(days):
+    """Recalcular los agregados diarios de analíticas"""
+    rollup_recent(days)
+    print(f"Agregados recalculados para los últimos {days} días")
+
+def parse_day(value):
+    """Fecha AAAA-MM-DD; ValueError si es inválida"""
+    return date.fromisoformat(value)
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import User, Video, Clip
+from ..models import User, Video
+from ..videos import info_cache
+from . import stats, rollups
 from .. import db
+from ..pagination import paginate
 from datetime import datetime, timedelta
 
 admin_bp = Blueprint('admin', __name__)
@@ -21,39 +24,57 @@ def get_stats():
         if not is_admin(user_id):
             return jsonify({'error': 'Acceso denegado'}), 403
         
-        # Estadísticas básicas
-        total_users = User.query.count()
-        total_videos = Video.query.count()
-        total_clips = Clip.query.count()
+        # Contadores mantenidos en cada escritura (sin recorrer las tablas)
+        snapshot, age = stats.snapshot()
         
-        # Usuarios por plan
-        users_by_plan = db.session.query(User.plan, db.func.count(User.id)).group_by(User.plan).all()
-        plan_stats = {plan: count for plan, count in users_by_plan}
+        return jsonify({
+            **snapshot,
+            'snapshot_age_seconds': age,
+            'video_info_cache': info_cache.stats()
+        }), 200
+        
+    except Exception as e:
+        print(f"Error al obtener estadísticas: {str(e)}")
+        return jsonify({'error': 'Error al obtener estadísticas'}), 500
+
+@admin_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    """Serie diaria de actividad (?start=AAAA-MM-DD&end=AAAA-MM-DD&plan=)"""
+    try:
+        user_id = get_jwt_identity()
+        
+        if not is_admin(user_id):
+            return jsonify({'error': 'Acceso denegado'}), 403
+        
+        today = datetime.utcnow().date()
+        try:
+            end = rollups.parse_day(request.args['end']) if request.args.get('end') else today
+            start = rollups.parse_day(request.args['start']) if request.args.get('start') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'Fechas inválidas (formato AAAA-MM-DD)'}), 400
         
-        # Videos por estado
-        videos_by_status = db.session.query(Video.status, db.func.count(Video.id)).group_by(Video.status).all()
-        status_stats = {status: count for status, count in videos_by_status}
+        if start > end:
+            return jsonify({'error': 'start debe ser anterior a end'}), 400
+        if (end - start).days >= 3660:
+            return jsonify({'error': 'Rango máximo de 10 años'}), 400
         
-        # Actividad reciente (últimos 7 días)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users_week = User.query.filter(User.created_at >= week_ago).count()
-        new_videos_week = Video.query.filter(Video.created_at >= week_ago).count()
+        days = rollups.series(start, end, request.args.get('plan'))
+        totals = {
+            metric: round(sum(day[metric] for day in days), 1)
+            for metric in rollups.METRICS
+        }
         
         return jsonify({
-            'total_users': total_users,
-            'total_videos': total_videos,
-            'total_clips': total_clips,
-            'users_by_plan': plan_stats,
-            'videos_by_status': status_stats,
-            'activity_week': {
-                'new_users': new_users_week,
-                'new_videos': new_videos_week
-            }
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': days,
+            'totals': totals
         }), 200
         
     except Exception as e:
-        print(f"Error al obtener estadísticas: {str(e)}")
-        return jsonify({'error': 'Error al obtener estadísticas'}), 500
+        print(f"Error al obtener analíticas: {str(e)}")
+        return jsonify({'error': 'Error al obtener analíticas'}), 500
 
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
@@ -65,17 +86,15 @@ def get_users():
         if not is_admin(user_id):
             return jsonify({'error': 'Acceso denegado'}), 403
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        users = User.query.order_by(User.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        # Paginación por cursor: sin COUNT(*) ni OFFSET en páginas profundas
+        try:
+            users, next_cursor = paginate(User.query, User)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         return jsonify({
-            'users': [user.to_dict() for user in users.items],
-            'total': users.total,
-            'pages': users.pages,
-            'current_page': page
+            'users': [user.to_dict() for user in users],
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -92,23 +111,21 @@ def get_all_videos():
         if not is_admin(user_id):
             return jsonify({'error': 'Acceso denegado'}), 403
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        videos = Video.query.order_by(Video.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        # El dueño se carga en el mismo SELECT (evita una consulta por video)
+        try:
+            videos, next_cursor = paginate(Video.query.options(db.joinedload(Video.user)), Video)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         videos_data = []
-        for video in videos.items:
+        for video in videos:
             video_data = video.to_dict()
             video_data['user_email'] = video.user.email if video.user else 'N/A'
             videos_data.append(video_data)
         
         return jsonify({
             'videos': videos_data,
-            'total': videos.total,
-            'pages': videos.pages,
-            'current_page': page
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -132,7 +149,7 @@ def get_user_details(user_id):
         user_data = user.to_dict()
         user_data['videos'] = [video.to_dict() for video in user.videos]
         user_data['total_videos'] = len(user.videos)
-        user_data['total_clips'] = sum(len(video.clips) for video in user.videos)
+        user_data['total_clips'] = sum(video.clips_count for video in user.videos)
         
         return jsonify(user_data), 200
         
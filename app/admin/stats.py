@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .. import db
+from ..models import User, Video, Clip, StatCounter
+import click
+import threading
+import time
+
+# Contadores de /admin/stats mantenidos en cada escritura.
+#
+# Un listener after_flush traduce los usuarios, videos y clips creados,
+# borrados o modificados (plan, estado) en sumas sobre la tabla
+# stat_counter, dentro de la misma transacción. El endpoint lee esa tabla
+# chica (una consulta) y guarda el resultado unos segundos por proceso.
+#
+#   users, users.plan.<plan>, users.day.<AAAA-MM-DD>
+#   videos, videos.status.<estado>, videos.day.<AAAA-MM-DD>
+#   clips
+#
+# Los contadores por día registran actividad: no se descuentan al borrar.
+
+_cache = {'snapshot': None, 'at': 0.0}
+_cache_lock = threading.Lock()
+_listening = False
+
+def _day(created_at):
+    return (created_at or datetime.utcnow()).date().isoformat()
+
+def _history_change(obj, attr):
+    """(anterior, nuevo) si el atributo cambió en este flush"""
+    history = db.inspect(obj).attrs[attr].history
+    if history.added and history.deleted:
+        return history.deleted[0], history.added[0]
+    return None
+
+def _deltas(session):
+    deltas = {}
+
+    def add(name, delta):
+        deltas[name] = deltas.get(name, 0) + delta
+
+    for obj in session.new:
+        if isinstance(obj, User):
+            add('users', 1)
+            add(f'users.plan.{obj.plan}', 1)
+            add(f'users.day.{_day(obj.created_at)}', 1)
+        elif isinstance(obj, Video):
+            add('videos', 1)
+            add(f'videos.status.{obj.status}', 1)
+            add(f'videos.day.{_day(obj.created_at)}', 1)
+        elif isinstance(obj, Clip):
+            add('clips', 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            add('users', -1)
+            add(f'users.plan.{obj.plan}', -1)
+        elif isinstance(obj, Video):
+            add('videos', -1)
+            add(f'videos.status.{obj.status}', -1)
+        elif isinstance(obj, Clip):
+            add('clips', -1)
+
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            change = _history_change(obj, 'plan')
+            prefix = 'users.plan'
+        elif isinstance(obj, Video):
+            change = _history_change(obj, 'status')
+            prefix = 'videos.status'
+        else:
+            continue
+        if change and change[0] != change[1]:
+            add(f'{prefix}.{change[0]}', -1)
+            add(f'{prefix}.{change[1]}', 1)
+
+    return {name: delta for name, delta in deltas.items() if delta}
+
+def upsert_insert(dialect):
+    """insert() con on_conflict_do_update del dialecto (None si no lo soporta)"""
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def apply_deltas(connection, deltas):
+    """Sumar deltas a los contadores (upsert; orden fijo para evitar deadlocks)"""
+    table = StatCounter.__table__
+    now = datetime.utcnow()
+    insert = upsert_insert(connection.dialect.name)
+
+    for name, delta in sorted(deltas.items()):
+        if insert:
+            stmt = insert(table).values(name=name, value=delta, updated_at=now)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=['name'],
+                set_={'value': table.c.value + delta, 'updated_at': now}
+            ))
+            continue
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(value=table.c.value + delta, updated_at=now)
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(name=name, value=delta, updated_at=now))
+
+def _after_flush(session, flush_context):
+    deltas = _deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def init_app(app):
+    """Registrar el listener de contadores y el comando `flask stats-rebuild`"""
+    global _listening
+    if not _listening:
+        event.listen(Session, 'after_flush', _after_flush)
+        _listening = True
+    app.cli.add_command(rebuild_command)
+
+def rebuild():
+    """Recalcular todos los contadores desde las tablas (backfill o reparación)"""
+    counters = {
+        'users': User.query.count(),
+        'videos': Video.query.count(),
+        'clips': Clip.query.count()
+    }
+    for plan, count in db.session.query(User.plan, db.func.count(User.id)).group_by(User.plan):
+        counters[f'users.plan.{plan}'] = count
+    for status, count in db.session.query(Video.status, db.func.count(Video.id)).group_by(Video.status):
+        counters[f'videos.status.{status}'] = count
+
+    for model, prefix in ((User, 'users.day'), (Video, 'videos.day')):
+        day = db.func.date(model.created_at)
+        for value, count in db.session.query(day, db.func.count(model.id)).group_by(day):
+            if value:
+                counters[f'{prefix}.{value}'] = count
+
+    now = datetime.utcnow()
+    StatCounter.query.delete()
+    db.session.add_all(StatCounter(name=name, value=value, updated_at=now) for name, value in counters.items())
+    db.session.commit()
+    invalidate()
+    return len(counters)
+
+@click.command('stats-rebuild')
+@with_appcontext
+def rebuild_command():
+    """Recalcular los contadores de /admin/stats desde cero"""
+    print(f"{rebuild()} contadores recalculados")
+
+def invalidate():
+    with _cache_lock:
+        _cache['snapshot'] = None
+
+def _read_snapshot():
+    today = datetime.utcnow().date()
+    week = [(today - timedelta(days=i)).isoformat() for i in range(7)]
+    day_names = [f'{prefix}.{day}' for prefix in ('users.day', 'videos.day') for day in week]
+
+    rows = StatCounter.query.filter(
+        db.or_(~StatCounter.name.like('%.day.%'), StatCounter.name.in_(day_names))
+    ).all()
+    values = {row.name: row.value for row in rows}
+
+    def group(prefix):
+        return {
+            name[len(prefix) + 1:]: value
+            for name, value in values.items()
+            if name.startswith(f'{prefix}.') and value
+        }
+
+    return {
+        'total_users': values.get('users', 0),
+        'total_videos': values.get('videos', 0),
+        'total_clips': values.get('clips', 0),
+        'users_by_plan': group('users.plan'),
+        'videos_by_status': group('videos.status'),
+        'activity_week': {
+            'new_users': sum(values.get(f'users.day.{day}', 0) for day in week),
+            'new_videos': sum(values.get(f'videos.day.{day}', 0) for day in week)
+        }
+    }
+
+def snapshot():
+    """Contadores actuales (cacheados STATS_CACHE_SECONDS) y su antigüedad en segundos"""
+    max_age = current_app.config.get('STATS_CACHE_SECONDS', 30)
+    now = time.time()
+    with _cache_lock:
+        cached, cached_at = _cache['snapshot'], _cache['at']
+    if cached is None or now - cached_at > max_age:
+        cached, cached_at = _read_snapshot(), now
+        with _cache_lock:
+            _cache['snapshot'], _cache['at'] = cached, cached_at
+    return cached, round(now - cached_at, 1)
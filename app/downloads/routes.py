@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models import Clip, Video
+from ..pagination import paginate
+from . import thumbnails
 import os
 
 downloads_bp = Blueprint('downloads', __name__)
@@ -74,13 +76,17 @@ def download_all_clips(video_id):
         if not video:
             return jsonify({'error': 'Video no encontrado'}), 404
         
-        clips = Clip.query.filter_by(video_id=video_id).all()
+        try:
+            clips, next_cursor = paginate(Clip.query.filter_by(video_id=video_id), Clip)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         return jsonify({
             'video': video.to_dict(),
             'clips': [clip.to_dict() for clip in clips],
-            'total_clips': len(clips),
-            'message': f'Descarga de {len(clips)} clips disponible'
+            'total_clips': video.clips_count,
+            'next_cursor': next_cursor,
+            'message': f'Descarga de {video.clips_count} clips disponible'
         }), 200
         
     except Exception as e:
@@ -94,15 +100,61 @@ def download_user_clips():
     try:
         user_id = get_jwt_identity()
         
-        # Obtener todos los clips del usuario
-        clips = Clip.query.join(Video).filter(Video.user_id == user_id).all()
+        # Clips del usuario, una página a la vez
+        try:
+            clips, next_cursor = paginate(Clip.query.join(Video).filter(Video.user_id == user_id), Clip)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         return jsonify({
-            'total_clips': len(clips),
+            # Clips de esta página: con cursor no hay total del usuario
+            'count': len(clips),
             'clips': [clip.to_dict() for clip in clips],
-            'message': f'Descarga de {len(clips)} clips disponible'
+            'next_cursor': next_cursor,
+            'message': f'Descarga de {len(clips)} clips disponible en esta página'
         }), 200
         
     except Exception as e:
         print(f"Error al obtener clips del usuario: {str(e)}")
-        return jsonify({'error': 'Error al obtener clips'}), 500 
\ No newline at end of file
+        return jsonify({'error': 'Error al obtener clips'}), 500
+
+@downloads_bp.route('/clip/<int:clip_id>/thumbnail', methods=['GET'])
+@jwt_required()
+def clip_thumbnail(clip_id):
+    """Thumbnail del clip al ancho y formato pedidos (?w=320&format=webp)"""
+    try:
+        user_id = get_jwt_identity()
+        
+        clip = Clip.query.join(Video).filter(
+            Clip.id == clip_id,
+            Video.user_id == user_id
+        ).first()
+        
+        if not clip or not clip.thumbnail_path or not os.path.exists(clip.thumbnail_path):
+            return jsonify({'error': 'Thumbnail no encontrado'}), 404
+        
+        try:
+            width = int(request.args.get('w', thumbnails.WIDTHS[1]))
+        except ValueError:
+            return jsonify({'error': 'Ancho inválido'}), 400
+        
+        # auto = WebP si el navegador lo acepta
+        fmt = request.args.get('format', 'auto').lower()
+        if fmt == 'auto':
+            fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+        elif fmt == 'jpg':
+            fmt = 'jpeg'
+        if fmt not in thumbnails.FORMATS:
+            return jsonify({'error': 'Formato no soportado'}), 400
+        
+        path, etag, mimetype = thumbnails.get_variant(clip.thumbnail_path, thumbnails.snap_width(width), fmt)
+        
+        # send_file responde 304 si el ETag coincide con If-None-Match
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True, max_age=86400)
+        response.headers['Cache-Control'] = 'private, max-age=86400'
+        response.vary.add('Accept')
+        return response
+        
+    except Exception as e:
+        print(f"Error al obtener thumbnail: {str(e)}")
+        return jsonify({'error': 'Error al obtener thumbnail'}), 500
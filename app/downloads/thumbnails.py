@@ -0,0 +1,96 @@
+from flask import current_app
+from ..videos import media_cache
+import os
+import threading
+
+# Variantes redimensionadas de los thumbnails, generadas al pedirlas.
+#
+#   <MEDIA_CACHE_DIR>/thumbs/<etag>.<formato>
+#
+# El nombre de cada variante es su ETag: huella del archivo original (ruta,
+# tamaño, fecha) más el ancho y formato pedidos, así que si el thumbnail
+# cambia la variante vieja simplemente deja de usarse y el LRU la desaloja.
+
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp')
+}
+
+# Anchos permitidos; el pedido se redondea al siguiente para acotar variantes
+WIDTHS = (160, 320, 480, 640, 960, 1280)
+
+_evict_lock = threading.Lock()
+
+def variants_dir():
+    return os.path.join(media_cache.cache_root(), 'thumbs')
+
+def snap_width(width):
+    """Ancho permitido más cercano por arriba"""
+    return next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+
+def variant_etag(source_path, width, fmt):
+    stat = os.stat(source_path)
+    return media_cache.fingerprint(os.path.abspath(source_path), stat.st_size, stat.st_mtime, width, fmt)
+
+def get_variant(source_path, width, fmt):
+    """Ruta, ETag y mimetype de la variante (generándola si no existe)"""
+    _, ext, mimetype = FORMATS[fmt]
+    etag = variant_etag(source_path, width, fmt)
+    path = os.path.join(variants_dir(), f"{etag}.{ext}")
+
+    if os.path.exists(path):
+        media_cache.touch(path)
+    else:
+        render(source_path, path, width, fmt)
+        evict()
+    return path, etag, mimetype
+
+def render(source_path, output_path, width, fmt):
+    """Redimensionar con Pillow (draft reduce la decodificación JPEG)"""
+    from PIL import Image
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp{os.getpid()}_{threading.get_ident()}"
+
+    with Image.open(source_path) as image:
+        image.draft('RGB', (width, width))
+        image = image.convert('RGB')
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        image.save(tmp_path, FORMATS[fmt][0], quality=82)
+
+    os.replace(tmp_path, output_path)
+
+def evict(max_bytes=None):
+    """Desalojar las variantes menos usadas hasta quedar bajo el límite"""
+    if max_bytes is None:
+        max_bytes = current_app.config.get('THUMBNAIL_CACHE_MAX_BYTES', 0)
+    if not max_bytes or not _evict_lock.acquire(blocking=False):
+        return 0
+
+    try:
+        base = variants_dir()
+        entries = []
+        for name in os.listdir(base):
+            path = os.path.join(base, name)
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        return evicted
+    finally:
+        _evict_lock.release()
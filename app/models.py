@@ -5,8 +5,10 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
-    plan = db.Column(db.String(20), default='free')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # active_history: el contador de /admin/stats necesita el valor anterior aunque
+    # la instancia esté expirada por un commit previo
+    plan = db.column_property(db.Column(db.String(20), default='free'), active_history=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     videos = db.relationship('Video', backref='user', lazy=True, cascade='all, delete-orphan')
 
     def to_dict(self):
@@ -18,12 +20,18 @@ class User(db.Model):
         }
 
 class Video(db.Model):
+    __table_args__ = (
+        db.Index('ix_video_user_id_created_at', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     youtube_url = db.Column(db.String(500), nullable=False)
     title = db.Column(db.String(200))
-    status = db.Column(db.String(20), default='processing')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # active_history como en User.plan
+    status = db.column_property(db.Column(db.String(20), default='processing', index=True), active_history=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     clips = db.relationship('Clip', backref='video', lazy=True, cascade='all, delete-orphan')
 
     def to_dict(self):
@@ -34,19 +42,22 @@ class Video(db.Model):
             'title': self.title,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'clips_count': len(self.clips)
+            'clips_count': self.clips_count
         }
 
 class Clip(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), nullable=False)
+    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), nullable=False, index=True)
     file_path = db.Column(db.String(500))
     thumbnail_path = db.Column(db.String(500))
+    sprite_path = db.Column(db.String(500))
+    preview_path = db.Column(db.String(500))
+    subtitles_path = db.Column(db.String(500))
     duration = db.Column(db.Float)
     start_time = db.Column(db.Float)
     end_time = db.Column(db.Float)
     title = db.Column(db.String(200))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def to_dict(self):
         return {
@@ -54,9 +65,112 @@ class Clip(db.Model):
             'video_id': self.video_id,
             'file_path': self.file_path,
             'thumbnail_path': self.thumbnail_path,
+            'sprite_path': self.sprite_path,
+            'preview_path': self.preview_path,
+            'subtitles_path': self.subtitles_path,
             'duration': self.duration,
             'start_time': self.start_time,
             'end_time': self.end_time,
             'title': self.title,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        } 
\ No newline at end of file
+        }
+
+# Cantidad de clips calculada en el mismo SELECT del video (sin cargar los clips)
+Video.clips_count = db.column_property(
+    db.select(db.func.count(Clip.id))
+    .where(Clip.video_id == Video.id)
+    .correlate_except(Clip)
+    .scalar_subquery()
+)
+
+class ProcessingJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('video.id'), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    video_url = db.Column(db.String(500), nullable=False)
+    encode_profile = db.Column(db.String(50))
+    status = db.Column(db.String(20), default='queued', index=True)
+    attempts = db.Column(db.Integer, default=0)
+    worker_id = db.Column(db.String(100), index=True)
+    lease_expires_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    stage = db.Column(db.String(20))
+    progress = db.Column(db.Float)
+    bytes_downloaded = db.Column(db.BigInteger, default=0)
+    bytes_saved = db.Column(db.BigInteger, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    video = db.relationship('Video', backref=db.backref('job', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'video_id': self.video_id,
+            'encode_profile': self.encode_profile,
+            'status': self.status,
+            'attempts': self.attempts,
+            'worker_id': self.worker_id,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'error': self.error,
+            'cancel_requested': bool(self.cancel_requested),
+            'stage': self.stage,
+            'progress': self.progress,
+            'bytes_downloaded': self.bytes_downloaded,
+            'bytes_saved': self.bytes_saved,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class VideoInfoCache(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    youtube_id = db.Column(db.String(20), unique=True, nullable=False, index=True)
+    data = db.Column(db.Text, nullable=False)
+    success = db.Column(db.Boolean, default=True)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class Transcript(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    youtube_id = db.Column(db.String(20), unique=True, nullable=False, index=True)
+    backend = db.Column(db.String(20))
+    segments = db.Column(db.Text, nullable=False, default='[]')
+    covered = db.Column(db.Text, nullable=False, default='[]')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class StatCounter(db.Model):
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DailyRollup(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('day', 'plan', name='uq_daily_rollup_day_plan'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    plan = db.Column(db.String(20), nullable=False)
+    signups = db.Column(db.Integer, default=0)
+    submissions = db.Column(db.Integer, default=0)
+    completions = db.Column(db.Integer, default=0)
+    failures = db.Column(db.Integer, default=0)
+    clips = db.Column(db.Integer, default=0)
+    processing_seconds = db.Column(db.Float, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'plan': self.plan,
+            'signups': self.signups,
+            'submissions': self.submissions,
+            'completions': self.completions,
+            'failures': self.failures,
+            'clips': self.clips,
+            'processing_seconds': self.processing_seconds
+        }
@@ -0,0 +1,49 @@
+from flask import current_app, request
+from . import db
+from datetime import datetime
+import base64
+import json
+
+# Paginación por cursor (keyset) sobre (created_at, id), de más nuevo a más
+# viejo. El cursor es opaco para el cliente: la posición del último elemento
+# de la página anterior. Cada página cuesta lo mismo sin importar qué tan
+# atrás esté, porque no hay OFFSET ni COUNT(*).
+
+def encode_cursor(created_at, item_id):
+    raw = json.dumps([created_at.isoformat() if created_at else None, item_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) del cursor; ValueError si es inválido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Cursor inválido') from e
+
+def page_size():
+    """Tamaño de página pedido con ?limit=, acotado por la configuración"""
+    default = current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+    maximum = current_app.config.get('PAGE_SIZE_MAX', 200)
+    limit = request.args.get('limit', default, type=int)
+    return min(max(limit, 1), maximum)
+
+def paginate(query, model):
+    """Una página de query según ?cursor= y ?limit=; devuelve (items, next_cursor)
+
+    Lanza ValueError si el cursor no es válido.
+    """
+    limit = page_size()
+    cursor = request.args.get('cursor')
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(db.tuple_(model.created_at, model.id) < (created_at, item_id))
+
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
@@ -0,0 +1,146 @@
+from . import supervisor
+import re
+
+# Selección de ventanas de clips a partir del contenido del video.
+#
+# Los planificadores reciben un archivo con audio (el audio sólo o el video
+# completo) y devuelven ventanas (inicio, fin) ordenadas por inicio. El de
+# energía decodifica el audio a mono de baja frecuencia, calcula todas las
+# características por cuadro con NumPy y puntúa cada ventana deslizante con
+# sumas acumuladas, así que recorre la señal una sola vez.
+
+ANALYSIS_SAMPLE_RATE = 8000
+FRAME_SECONDS = 0.1
+SILENCE_DB = -45.0
+
+# Pesos de cada característica en la puntuación de una ventana
+WEIGHTS = {'rms': 1.0, 'onset': 0.5, 'silence': 1.0, 'scene': 0.5}
+
+def decode_pcm(media_path, sample_rate, start=None, duration=None, timeout=600):
+    """Audio mono int16 a sample_rate, remuestreado por FFmpeg
+
+    Con start el -ss va antes de -i, así FFmpeg salta al tramo en lugar de
+    decodificar el archivo desde el principio.
+    """
+    import numpy as np
+
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error']
+    if start:
+        cmd += ['-ss', str(start)]
+    cmd += ['-i', media_path]
+    if duration:
+        cmd += ['-t', str(duration)]
+    cmd += ['-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-']
+
+    result = supervisor.run(cmd, timeout=timeout, binary=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo decodificar el audio: {result.stderr[-300:]}")
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+def load_samples(audio_path):
+    """Decodificar el audio a un arreglo int16 mono de baja frecuencia"""
+    return decode_pcm(audio_path, ANALYSIS_SAMPLE_RATE), ANALYSIS_SAMPLE_RATE
+
+def frame_features(samples, sample_rate):
+    """RMS normalizado, onsets y silencio por cuadro de FRAME_SECONDS"""
+    import numpy as np
+
+    frame_size = max(int(sample_rate * FRAME_SECONDS), 1)
+    num_frames = len(samples) // frame_size
+    frames = samples[:num_frames * frame_size].reshape(num_frames, frame_size)
+
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1)) / 32768.0
+    db = 20 * np.log10(np.maximum(rms, 1e-6))
+
+    # Subidas bruscas de energía (golpes, risas, aplausos)
+    onset = np.maximum(np.diff(db, prepend=db[:1]), 0)
+
+    peak = rms.max() if num_frames else 0
+    return {
+        'rms': rms / peak if peak > 0 else rms,
+        'onset': onset / onset.max() if num_frames and onset.max() > 0 else onset,
+        'silence': (db < SILENCE_DB).astype(np.float32)
+    }
+
+def scene_changes(video_path, threshold=0.3):
+    """Instantes (segundos) de cambio de escena detectados por FFmpeg"""
+    cmd = [
+        'ffmpeg',
+        '-i', video_path,
+        '-vf', f"select='gt(scene,{threshold})',showinfo",
+        '-an',
+        '-f', 'null',
+        '-'
+    ]
+    result = supervisor.run(cmd, timeout=600)
+    return [float(t) for t in re.findall(r'pts_time:([0-9.]+)', result.stderr)]
+
+def window_scores(features, window_frames):
+    """Puntuación media de cada ventana deslizante (sumas acumuladas)"""
+    import numpy as np
+
+    total = None
+    for name, values in features.items():
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        means = (sums[window_frames:] - sums[:-window_frames]) / window_frames
+        weight = -WEIGHTS[name] if name == 'silence' else WEIGHTS[name]
+        total = means * weight if total is None else total + means * weight
+    return total
+
+def pick_non_overlapping(scores, num_clips, window_frames):
+    """Elegir las mejores ventanas sin solapamiento; devuelve cuadros de inicio"""
+    import numpy as np
+
+    chosen = []
+    for start in np.argsort(scores)[::-1]:
+        if all(abs(int(start) - other) >= window_frames for other in chosen):
+            chosen.append(int(start))
+            if len(chosen) == num_clips:
+                break
+    return sorted(chosen)
+
+def plan_uniform(media_path, duration, num_clips, clip_duration, video_path=None):
+    """Ventanas repartidas uniformemente (no lee el archivo)"""
+    windows = []
+    for i in range(num_clips):
+        start_time = i * (duration / num_clips)
+        windows.append((start_time, min(start_time + clip_duration, duration)))
+    return windows
+
+def plan_energy(media_path, duration, num_clips, clip_duration, video_path=None):
+    """Ventanas con más energía y actividad de audio (y cambios de escena)"""
+    import numpy as np
+
+    samples, sample_rate = load_samples(media_path)
+    features = frame_features(samples, sample_rate)
+    num_frames = len(features['rms'])
+
+    audio_duration = num_frames * FRAME_SECONDS
+    duration = min(duration, audio_duration) if duration else audio_duration
+    window_frames = int(round(clip_duration / FRAME_SECONDS))
+    if window_frames <= 0 or window_frames >= num_frames:
+        return [(0, duration)]
+
+    if video_path:
+        scene = np.zeros(num_frames, dtype=np.float32)
+        for t in scene_changes(video_path):
+            frame = int(t / FRAME_SECONDS)
+            if frame < num_frames:
+                scene[frame] = 1.0
+        features['scene'] = scene
+
+    scores = window_scores(features, window_frames)
+    return [
+        (start * FRAME_SECONDS, min(start * FRAME_SECONDS + clip_duration, duration))
+        for start in pick_non_overlapping(scores, num_clips, window_frames)
+    ]
+
+PLANNERS = {
+    'uniform': plan_uniform,
+    'energy': plan_energy
+}
+
+def plan(name, media_path, duration, num_clips, clip_duration, video_path=None):
+    """Ejecutar el planificador configurado"""
+    planner = PLANNERS.get(name, plan_energy)
+    return planner(media_path, duration, num_clips, clip_duration, video_path)
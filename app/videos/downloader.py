@@ -0,0 +1,118 @@
+from . import supervisor
+import json
+import os
+import sys
+import tempfile
+
+# yt-dlp como librería: una sola extracción por trabajo, sin lanzar otro
+# intérprete. Si la librería no está instalada se usa el binario.
+#
+# Las descargas corren en un hijo (python -m yt_dlp --load-info-json) bajo
+# supervisor.run: reutilizan la info ya extraída, pero el timeout y la
+# cancelación matan también los ffmpeg que lanza yt-dlp, cosa que dentro
+# del proceso no se puede.
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+class _QuietLogger:
+    def debug(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        print(f"yt-dlp: {msg}")
+
+def available():
+    return yt_dlp is not None
+
+def _options(**extra):
+    options = {
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True,
+        'socket_timeout': 30,
+        'logger': _QuietLogger()
+    }
+    options.update(extra)
+    return options
+
+def video_url(video_id):
+    return f'https://www.youtube.com/watch?v={video_id}'
+
+def extract_info(video_id):
+    """Extraer la información completa del video (sin descargar)"""
+    with yt_dlp.YoutubeDL(_options()) as ydl:
+        return ydl.sanitize_info(ydl.extract_info(video_url(video_id), download=False))
+
+def extract_playlist(url):
+    """IDs de los videos de una playlist o canal (extracción plana, sin visitar cada video)"""
+    with yt_dlp.YoutubeDL(_options(extract_flat='in_playlist')) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return [entry['id'] for entry in (info or {}).get('entries') or [] if entry and entry.get('id')]
+
+def _run(video_id, args, info, timeout, workdir):
+    """Correr yt-dlp en un hijo supervisado; con info no vuelve a extraer"""
+    cmd = [sys.executable, '-m', 'yt_dlp', '--newline', '--no-warnings', '--socket-timeout', '30', *args]
+    info_path = None
+    if info:
+        with tempfile.NamedTemporaryFile('w', suffix='.info.json', dir=workdir, delete=False) as f:
+            json.dump(info, f)
+            info_path = f.name
+        cmd += ['--load-info-json', info_path]
+    else:
+        cmd.append(video_url(video_id))
+
+    try:
+        result = supervisor.run(cmd, timeout=timeout, progress=supervisor.ytdlp_progress)
+    finally:
+        if info_path:
+            os.remove(info_path)
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-500:])
+    return result
+
+def download(video_id, output_path, fmt, info=None, timeout=900):
+    """Descargar el video reutilizando la info ya extraída si se proporciona"""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    _run(video_id, ['-f', fmt, '-o', output_path], info, timeout, os.path.dirname(output_path))
+    return os.path.exists(output_path)
+
+def download_sections(video_id, output_prefix, windows, fmt, info=None, timeout=900):
+    """Descargar sólo las ventanas (inicio, fin); devuelve una ruta por ventana"""
+    os.makedirs(os.path.dirname(output_prefix), exist_ok=True)
+    args = [
+        '-f', fmt,
+        '-o', f"{output_prefix}_%(section_start)s.%(ext)s",
+        # --print implica --quiet: --progress mantiene las líneas de avance
+        '--progress',
+        '--print', 'after_move:%(.{section_start,filepath,filesize,filesize_approx,tbr})j'
+    ]
+    for start_time, end_time in windows:
+        args += ['--download-sections', f'*{start_time}-{end_time}']
+
+    output = _run(video_id, args, info, timeout, os.path.dirname(output_prefix)).stdout
+    downloads = [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+    result = {'requested_downloads': downloads, 'duration': (info or {}).get('duration')}
+    by_start = {d.get('section_start'): d.get('filepath') for d in downloads}
+    paths = [by_start.get(start) for start, _ in windows]
+    if not all(paths) and len(downloads) == len(windows):
+        paths = [d.get('filepath') for d in downloads]
+
+    return paths, result
+
+def estimated_size(result):
+    """Tamaño estimado (bytes) del video completo en el formato elegido"""
+    if not result:
+        return 0
+    downloads = result.get('requested_downloads') or [result]
+    fmt = downloads[0]
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    duration = result.get('duration')
+    if not size and fmt.get('tbr') and duration:
+        size = fmt['tbr'] * 1000 / 8 * duration
+    return int(size or 0)
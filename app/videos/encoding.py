@@ -0,0 +1,132 @@
+from . import supervisor
+from contextlib import nullcontext
+import os
+import threading
+
+# Perfiles de codificación de clips y reparto de núcleos entre los FFmpeg
+# que codifican al mismo tiempo.
+
+PROFILES = {
+    'source': None,
+    'landscape_720p': {
+        'width': 1280, 'height': 720, 'fit': 'pad',
+        'crf': 23, 'preset': 'veryfast', 'audio_bitrate': '128k'
+    },
+    'vertical_1080p': {
+        'width': 1080, 'height': 1920, 'fit': 'crop',
+        'crf': 23, 'preset': 'veryfast', 'audio_bitrate': '128k'
+    },
+    'vertical_720p': {
+        'width': 720, 'height': 1280, 'fit': 'crop',
+        'crf': 24, 'preset': 'veryfast', 'audio_bitrate': '96k'
+    },
+    'vertical_padded_1080p': {
+        'width': 1080, 'height': 1920, 'fit': 'pad',
+        'crf': 23, 'preset': 'veryfast', 'audio_bitrate': '128k'
+    }
+}
+
+def get_profile(name):
+    """Perfil por nombre; None = copiar el video tal cual"""
+    return PROFILES.get(name or 'source')
+
+def video_filters(profile=None, subtitle_path=None):
+    """Cadena -vf: escalar/recortar/rellenar y luego quemar subtítulos"""
+    filters = []
+    if profile:
+        width, height = profile['width'], profile['height']
+        if profile['fit'] == 'crop':
+            filters += [
+                f"scale={width}:{height}:force_original_aspect_ratio=increase",
+                f"crop={width}:{height}"
+            ]
+        else:
+            filters += [
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+            ]
+        filters.append('setsar=1')
+    if subtitle_path:
+        filters.append(f"subtitles={subtitle_path}")
+    return ','.join(filters)
+
+def codec_args(profile=None, subtitle_path=None, threads=None):
+    """Parámetros de salida: copia si no hay nada que recodificar"""
+    if not profile and not subtitle_path:
+        return ['-c', 'copy']
+
+    args = ['-vf', video_filters(profile, subtitle_path)]
+    args += [
+        '-c:v', 'libx264',
+        '-preset', profile['preset'] if profile else 'veryfast',
+        '-crf', str(profile['crf'] if profile else 23),
+        '-c:a', 'aac'
+    ]
+    if profile:
+        args += ['-b:a', profile['audio_bitrate']]
+    if threads:
+        args += ['-threads', str(threads)]
+    return args
+
+def needs_encode(profile=None, subtitle_path=None):
+    return bool(profile or subtitle_path)
+
+class CoreScheduler:
+    """Reparte los núcleos entre los encodes simultáneos
+
+    Cada encode recibe una parte fija, total // concurrency (al menos un
+    hilo), donde concurrency es cuántos encodes pueden correr a la vez. No
+    espera nunca: cuántos FFmpeg corren lo limita el semáforo de FFmpeg,
+    que se toma siempre antes que los hilos.
+    """
+
+    def __init__(self, total, concurrency=1):
+        self.total = max(total, 1)
+        self.share = max(1, self.total // max(concurrency, 1))
+
+    def reserve(self):
+        """Hilos de un encode, como context manager alrededor del FFmpeg"""
+        return nullcontext(self.share)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def expected_encodes(config):
+    """Encodes que pueden correr a la vez con la configuración de la app"""
+    cpus = os.cpu_count() or 1
+    # Los cortes exactos recodifican los bordes de cada clip en paralelo
+    if config.get('CLIP_EXTRACTION_MODE') == 'single_pass' and config.get('CLIP_CUT_MODE') != 'smart':
+        per_video = 1
+    else:
+        per_video = config.get('CLIP_WORKERS') or cpus
+    return min(config.get('FFMPEG_CONCURRENCY') or cpus, config.get('VIDEO_WORKERS', 1) * per_video)
+
+def configure(total_threads, concurrency):
+    """Fijar los hilos a repartir (0 = núcleos) y los encodes simultáneos esperados"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = CoreScheduler(total_threads or os.cpu_count() or 1, concurrency)
+
+def core_scheduler():
+    if _scheduler is None:
+        configure(0, os.cpu_count() or 1)
+    return _scheduler
+
+def encode_file(clip_path, profile, slots, subtitle_path=None, timeout=300):
+    """Recodificar un clip ya cortado con un perfil y/o subtítulos (reemplaza el archivo)"""
+    tmp_path = f"{os.path.splitext(clip_path)[0]}.encoding.mp4"
+    with slots, core_scheduler().reserve() as threads:
+        cmd = ['ffmpeg', '-y', '-i', clip_path, *codec_args(profile, subtitle_path, threads), tmp_path]
+        result = supervisor.run(cmd, timeout=timeout)
+
+    if result.returncode != 0 or not os.path.exists(tmp_path):
+        print(f"Error codificando clip: {result.stderr[-500:]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    final_path = f"{os.path.splitext(clip_path)[0]}.mp4"
+    os.replace(tmp_path, final_path)
+    if final_path != clip_path and os.path.exists(clip_path):
+        os.remove(clip_path)
+    return final_path
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from .. import db
+from ..models import VideoInfoCache
+import json
+import re
+import threading
+
+# Caché de metadatos de YouTube en dos niveles: LRU en memoria del proceso
+# y tabla video_info_cache compartida entre procesos y reinicios.
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_counters = {'memory_hits': 0, 'db_hits': 0, 'negative_hits': 0, 'misses': 0}
+
+# Errores de yt-dlp que indican que el video no existe o no se puede ver;
+# sólo esos se cachean como negativos (no timeouts ni fallas de red)
+UNAVAILABLE_PATTERN = re.compile(
+    r'video unavailable|private video|has been removed|is not available|does not exist'
+    r'|account associated with this video has been terminated|copyright claim|confirm your age',
+    re.IGNORECASE
+)
+
+def is_unavailable(error):
+    """True si el mensaje de error de yt-dlp es definitivo"""
+    return bool(error and UNAVAILABLE_PATTERN.search(error))
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+def stats():
+    """Contadores de aciertos/fallos de la caché de metadatos"""
+    with _lock:
+        data = dict(_counters)
+        data['memory_entries'] = len(_memory)
+    lookups = data['memory_hits'] + data['db_hits'] + data['misses']
+    data['hit_rate'] = round((data['memory_hits'] + data['db_hits']) / lookups, 3) if lookups else None
+    return data
+
+def _remember(youtube_id, info, expires_at):
+    max_entries = current_app.config.get('VIDEO_INFO_CACHE_SIZE', 1024)
+    with _lock:
+        _memory[youtube_id] = (info, expires_at)
+        _memory.move_to_end(youtube_id)
+        while len(_memory) > max_entries:
+            _memory.popitem(last=False)
+
+def _from_memory(youtube_id, now):
+    with _lock:
+        entry = _memory.get(youtube_id)
+        if not entry:
+            return None
+        info, expires_at = entry
+        if expires_at <= now:
+            del _memory[youtube_id]
+            return None
+        _memory.move_to_end(youtube_id)
+        return info
+
+def get_or_fetch(youtube_id, fetch):
+    """Devolver la info cacheada de un video o llamar a fetch(youtube_id)"""
+    now = datetime.utcnow()
+
+    info = _from_memory(youtube_id, now)
+    if info is not None:
+        _count('memory_hits' if info.get('success') else 'negative_hits')
+        return info
+
+    row = VideoInfoCache.query.filter_by(youtube_id=youtube_id).first()
+    if row and row.expires_at > now:
+        info = json.loads(row.data)
+        _remember(youtube_id, info, row.expires_at)
+        _count('db_hits' if info.get('success') else 'negative_hits')
+        return info
+
+    _count('misses')
+    info = fetch(youtube_id)
+
+    # Los videos no disponibles también se cachean, pero por menos tiempo;
+    # un error transitorio no se guarda para que el próximo pedido reintente
+    if info.get('success'):
+        ttl = current_app.config.get('VIDEO_INFO_TTL', 86400)
+    elif info.get('unavailable'):
+        ttl = current_app.config.get('VIDEO_INFO_NEGATIVE_TTL', 600)
+    else:
+        return info
+    expires_at = now + timedelta(seconds=ttl)
+
+    try:
+        if not row:
+            row = VideoInfoCache(youtube_id=youtube_id)
+            db.session.add(row)
+        row.data = json.dumps(info)
+        row.success = bool(info.get('success'))
+        row.fetched_at = now
+        row.expires_at = expires_at
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error guardando caché de metadatos: {str(e)}")
+
+    _remember(youtube_id, info, expires_at)
+    return info
@@ -0,0 +1,346 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models import ProcessingJob, Video
+from . import supervisor, progress
+import click
+import os
+import signal
+import socket
+import threading
+import uuid
+
+# Estados de video que indican procesamiento pendiente
+ACTIVE_VIDEO_STATUSES = ('queued', 'downloading', 'processing')
+
+def new_worker_id():
+    """Identificador único del proceso que reclama trabajos"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def enqueue_job(video, video_url, encode_profile=None):
+    """Agregar trabajo a la cola (el commit lo hace quien llama)"""
+    job = ProcessingJob(
+        video_id=video.id,
+        user_id=video.user_id,
+        video_url=video_url,
+        encode_profile=encode_profile,
+        status='queued'
+    )
+    db.session.add(job)
+    return job
+
+def recover_jobs():
+    """Recuperar videos pendientes que no tienen trabajo en la cola"""
+    orphans = Video.query.outerjoin(ProcessingJob).filter(
+        Video.status.in_(ACTIVE_VIDEO_STATUSES),
+        ProcessingJob.id.is_(None)
+    ).all()
+
+    # Otro proceso que arranca al mismo tiempo puede recuperar el mismo video:
+    # la restricción única de video_id decide y aquí se ignora el duplicado
+    recovered = 0
+    for video in orphans:
+        try:
+            enqueue_job(video, video.youtube_url)
+            db.session.commit()
+            recovered += 1
+        except IntegrityError:
+            db.session.rollback()
+    return recovered
+
+def fail_exhausted_jobs(max_attempts):
+    """Marcar como fallidos los trabajos con lease vencido y sin reintentos"""
+    now = datetime.utcnow()
+    exhausted = ProcessingJob.query.filter(
+        ProcessingJob.status == 'running',
+        ProcessingJob.lease_expires_at < now,
+        ProcessingJob.attempts >= max_attempts
+    ).all()
+
+    for job in exhausted:
+        job.status = 'failed'
+        job.error = 'Lease vencido tras el máximo de intentos'
+        if job.video:
+            job.video.status = 'failed'
+
+    # Cancelados cuyo worker murió antes de verlo: no se reintentan
+    orphaned = ProcessingJob.query.filter(
+        ProcessingJob.status == 'running',
+        ProcessingJob.lease_expires_at < now,
+        ProcessingJob.cancel_requested.is_(True)
+    ).all()
+
+    for job in orphaned:
+        job.status = 'cancelled'
+        job.error = 'Cancelado por el usuario'
+        if job.video:
+            job.video.status = 'cancelled'
+
+    db.session.commit()
+    return len(exhausted)
+
+def claim_job(worker_id, lease_seconds, max_attempts):
+    """Reclamar el siguiente trabajo disponible de forma atómica"""
+    now = datetime.utcnow()
+    candidates = ProcessingJob.query.filter(
+        db.or_(
+            ProcessingJob.status == 'queued',
+            db.and_(
+                ProcessingJob.status == 'running',
+                ProcessingJob.lease_expires_at < now,
+                ProcessingJob.attempts < max_attempts,
+                ProcessingJob.cancel_requested.isnot(True)
+            )
+        )
+    ).order_by(ProcessingJob.id).limit(10).all()
+
+    for candidate in candidates:
+        # Compare-and-swap: sólo gana quien ve el mismo estado e intentos
+        claimed = ProcessingJob.query.filter(
+            ProcessingJob.id == candidate.id,
+            ProcessingJob.status == candidate.status,
+            ProcessingJob.attempts == candidate.attempts
+        ).update({
+            'status': 'running',
+            'worker_id': worker_id,
+            'attempts': candidate.attempts + 1,
+            'started_at': now,
+            'heartbeat_at': now,
+            'lease_expires_at': now + timedelta(seconds=lease_seconds),
+            'updated_at': now
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            db.session.expire_all()
+            return db.session.get(ProcessingJob, candidate.id)
+
+    return None
+
+def heartbeat(worker_id, lease_seconds):
+    """Extender el lease de los trabajos que este proceso está ejecutando"""
+    now = datetime.utcnow()
+    updated = ProcessingJob.query.filter(
+        ProcessingJob.worker_id == worker_id,
+        ProcessingJob.status == 'running'
+    ).update({
+        'heartbeat_at': now,
+        'lease_expires_at': now + timedelta(seconds=lease_seconds)
+    }, synchronize_session=False)
+    db.session.commit()
+    return updated
+
+def cancel_job(job):
+    """Cancelar un trabajo: en cola se cierra aquí, en curso se avisa al worker"""
+    if job.status == 'queued':
+        cancelled = ProcessingJob.query.filter(
+            ProcessingJob.id == job.id,
+            ProcessingJob.status == 'queued'
+        ).update({
+            'status': 'cancelled',
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+        if cancelled:
+            job.video.status = 'cancelled'
+            db.session.commit()
+            return True
+        db.session.refresh(job)
+
+    if job.status != 'running':
+        return False
+
+    # El worker dueño lo ve en su próximo heartbeat; si es este proceso, ya
+    job.cancel_requested = True
+    db.session.commit()
+    supervisor.cancel(job.video_id)
+    return True
+
+def cancel_requested_jobs(worker_id):
+    """Cancelar los trabajos de este proceso que fueron cancelados desde la API"""
+    jobs = ProcessingJob.query.filter(
+        ProcessingJob.worker_id == worker_id,
+        ProcessingJob.status == 'running',
+        ProcessingJob.cancel_requested.is_(True)
+    ).all()
+    for job in jobs:
+        supervisor.cancel(job.video_id)
+    return len(jobs)
+
+def finish_job(job_id, worker_id, status, error=None):
+    """Cerrar un trabajo si todavía pertenece a este proceso"""
+    ProcessingJob.query.filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.worker_id == worker_id,
+        ProcessingJob.status == 'running'
+    ).update({
+        'status': status,
+        'error': error,
+        'lease_expires_at': None,
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+
+class JobQueue:
+    """Pool de tamaño fijo que consume la tabla de trabajos"""
+
+    def __init__(self, app, workers=None):
+        self.app = app
+        self.workers = workers or app.config['VIDEO_WORKERS']
+        self.lease_seconds = app.config['JOB_LEASE_SECONDS']
+        self.max_attempts = app.config['JOB_MAX_ATTEMPTS']
+        self.poll_interval = app.config['JOB_POLL_INTERVAL']
+        self.progress_interval = app.config['PROGRESS_FLUSH_INTERVAL']
+        self.rollup_interval = app.config['ROLLUP_INTERVAL']
+        self.worker_id = new_worker_id()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Recuperar trabajos pendientes e iniciar los hilos del pool"""
+        try:
+            with self.app.app_context():
+                recovered = recover_jobs()
+                if recovered:
+                    print(f"Recuperados {recovered} videos pendientes en la cola")
+        except Exception as e:
+            print(f"Error recuperando videos pendientes: {str(e)}")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f"video-worker-{i+1}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+        loops = [(self._heartbeat_loop, 'heartbeat'), (self._progress_loop, 'progress')]
+        if self.rollup_interval:
+            loops.append((self._rollup_loop, 'rollup'))
+        for target, name in loops:
+            thread = threading.Thread(target=target, name=f'video-worker-{name}')
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Detener el pool después de terminar los trabajos en curso"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def run_forever(self):
+        """Bloquear el proceso hasta SIGTERM/SIGINT y esperar los trabajos en curso"""
+        def handle_signal(signum, frame):
+            print(f"Señal {signum} recibida, deteniendo workers...")
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+
+        if not self._threads:
+            self.start()
+
+        while not self._stop.wait(1):
+            pass
+
+        for thread in self._threads:
+            thread.join()
+
+    def notify(self):
+        """Despertar a los hilos en espera cuando llega un trabajo nuevo"""
+        self._wakeup.set()
+
+    def _heartbeat_loop(self):
+        interval = max(self.lease_seconds / 3, 1)
+        while not self._stop.wait(interval):
+            try:
+                with self.app.app_context():
+                    heartbeat(self.worker_id, self.lease_seconds)
+                    cancel_requested_jobs(self.worker_id)
+                    fail_exhausted_jobs(self.max_attempts)
+            except Exception as e:
+                print(f"Error en heartbeat de trabajos: {str(e)}")
+
+    def _progress_loop(self):
+        while not self._stop.wait(self.progress_interval):
+            try:
+                with self.app.app_context():
+                    progress.flush(self.worker_id)
+            except Exception as e:
+                print(f"Error guardando progreso de trabajos: {str(e)}")
+
+    def _rollup_loop(self):
+        from ..admin import rollups
+
+        while not self._stop.wait(self.rollup_interval):
+            try:
+                with self.app.app_context():
+                    rollups.rollup_recent()
+            except Exception as e:
+                print(f"Error recalculando agregados diarios: {str(e)}")
+
+    def _work_loop(self):
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                print(f"Error en worker de videos: {str(e)}")
+                worked = False
+
+            if not worked:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self):
+        """Reclamar y ejecutar un trabajo; devuelve False si la cola está vacía"""
+        from .video_routes import process_video_async
+
+        with self.app.app_context():
+            job = claim_job(self.worker_id, self.lease_seconds, self.max_attempts)
+            if not job:
+                return False
+
+            job_id, video_id = job.id, job.video_id
+            user_id, video_url = job.user_id, job.video_url
+
+        with self.app.app_context(), supervisor.job_context(video_id):
+            process_video_async(video_id, user_id, video_url)
+
+        with self.app.app_context():
+            video = db.session.get(Video, video_id)
+            if video and video.status == 'completed':
+                finish_job(job_id, self.worker_id, 'completed')
+            elif video and video.status == 'cancelled':
+                finish_job(job_id, self.worker_id, 'cancelled', 'Cancelado por el usuario')
+            else:
+                finish_job(job_id, self.worker_id, 'failed', 'El procesamiento del video falló')
+
+        progress.notify()
+
+        return True
+
+def start_job_queue(app):
+    """Iniciar el pool de trabajos de la aplicación (una vez por proceso)"""
+    if 'job_queue' not in app.extensions:
+        queue = JobQueue(app)
+        app.extensions['job_queue'] = queue
+        queue.start()
+    return app.extensions['job_queue']
+
+@click.command('worker')
+@click.option('--workers', type=int, default=None, help='Cantidad de hilos de procesamiento')
+@with_appcontext
+def worker_command(workers):
+    """Procesar videos de la cola en este proceso (fuera de gunicorn)"""
+    app = current_app._get_current_object()
+    queue = JobQueue(app, workers=workers)
+    app.extensions['job_queue'] = queue
+
+    print(f"Worker {queue.worker_id} procesando con {queue.workers} hilos")
+    queue.run_forever()
+
+def notify_job_queue(app):
+    """Avisar al pool local que hay trabajos nuevos"""
+    queue = app.extensions.get('job_queue')
+    if queue:
+        queue.notify()
@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import tempfile
+from . import encoding, supervisor
+
+# Índice de keyframes por video descargado, para cortes exactos casi a
+# velocidad de copia: se copia el tramo alineado a GOPs y sólo se recodifican
+# los GOPs parciales de los bordes del clip.
+#
+# El índice se guarda junto al video (<video>.keyframes.json) y se invalida
+# si cambian el tamaño o la fecha del archivo.
+
+SEEK_EPSILON = 0.001
+MIN_COPY_SECONDS = 1.0
+# Diferencia mínima (segundos) para corregir el inicio de un corte copiado
+COPY_START_TOLERANCE = 0.05
+
+def probe(path):
+    """Formato y streams del archivo según ffprobe"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration:stream=codec_type,codec_name,width,height,pix_fmt,sample_rate,channels',
+        '-of', 'json',
+        path
+    ]
+    result = supervisor.run(cmd, timeout=60)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+def probe_duration(path):
+    """Duración real del archivo en segundos (None si no se puede leer)"""
+    info = probe(path)
+    try:
+        return float(info['format']['duration'])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+def read_keyframes(path):
+    """Tiempos de los keyframes de video (sólo demux, sin decodificar)"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        path
+    ]
+    result = supervisor.run(cmd, timeout=300)
+    if result.returncode != 0:
+        return None
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+def build_index(path):
+    """Construir el índice de keyframes y parámetros del stream"""
+    info = probe(path)
+    keyframes = read_keyframes(path)
+    if not info or keyframes is None:
+        return None
+
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    stat = os.stat(path)
+
+    return {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'duration': float(info.get('format', {}).get('duration') or 0),
+        'keyframes': keyframes,
+        'video': {k: video.get(k) for k in ('codec_name', 'width', 'height', 'pix_fmt')},
+        'audio': {k: audio.get(k) for k in ('codec_name', 'sample_rate', 'channels')} if audio else None
+    }
+
+def load_index(path):
+    """Índice cacheado en disco; se reconstruye si el video cambió"""
+    index_path = f"{path}.keyframes.json"
+    stat = os.stat(path)
+
+    if os.path.exists(index_path):
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            if index.get('size') == stat.st_size and index.get('mtime') == stat.st_mtime:
+                return index
+        except (OSError, ValueError):
+            pass
+
+    index = build_index(path)
+    if index:
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+    return index
+
+def keyframe_before(index, t):
+    """Último keyframe <= t (donde cae un corte con -c copy)"""
+    candidates = [k for k in index['keyframes'] if k <= t + SEEK_EPSILON]
+    return candidates[-1] if candidates else 0.0
+
+def copy_cut_start(start_time, end_time, duration):
+    """Inicio real de un corte con -ss en la entrada y -c copy
+
+    El clip termina donde se pidió. En MP4 una edit list oculta el tramo
+    desde el keyframe anterior y el clip dura lo pedido; en contenedores
+    sin edit list (mkv, webm) ese tramo se ve y el clip empieza antes.
+    """
+    if duration and end_time - duration < start_time - COPY_START_TOLERANCE:
+        return max(end_time - duration, 0.0)
+    return start_time
+
+def keyframe_after(index, t):
+    candidates = [k for k in index['keyframes'] if k >= t - SEEK_EPSILON]
+    return candidates[0] if candidates else None
+
+def audio_encode_args(index):
+    """Audio AAC con la frecuencia y canales del original"""
+    if not index.get('audio'):
+        return []
+    args = ['-c:a', 'aac']
+    if index['audio'].get('sample_rate'):
+        args += ['-ar', str(index['audio']['sample_rate'])]
+    if index['audio'].get('channels'):
+        args += ['-ac', str(index['audio']['channels'])]
+    return args
+
+def encode_args(index, threads=None):
+    """Parámetros de recodificación compatibles con el tramo copiado"""
+    args = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18']
+    if index['video'].get('pix_fmt'):
+        args += ['-pix_fmt', index['video']['pix_fmt']]
+    if threads:
+        args += ['-threads', str(threads)]
+    return args + audio_encode_args(index)
+
+def smart_cut(video_path, index, start_time, end_time, clip_path, slots, timeout=180):
+    """Corte exacto: copia los GOPs completos y recodifica sólo los bordes"""
+    first = keyframe_after(index, start_time)
+    last = keyframe_before(index, end_time)
+    audio_is_aac = bool(index.get('audio')) and index['audio'].get('codec_name') == 'aac'
+
+    # Sin GOPs completos dentro (o códec no concatenable): recodificar todo
+    if (first is None or last - first < MIN_COPY_SECONDS
+            or index['video'].get('codec_name') != 'h264'):
+        with slots, encoding.core_scheduler().reserve() as threads:
+            cmd = [
+                'ffmpeg', '-y',
+                '-ss', str(start_time), '-t', str(end_time - start_time), '-i', video_path,
+                '-map', '0:v:0', '-map', '0:a:0?',
+                *encode_args(index, threads),
+                '-movflags', '+faststart',
+                clip_path
+            ]
+            result = supervisor.run(cmd, timeout=timeout)
+        return result.returncode == 0 and os.path.exists(clip_path)
+
+    segments = []
+    if first - start_time > SEEK_EPSILON:
+        segments.append((start_time, first, 'encode'))
+    segments.append((first, last, 'copy'))
+    if end_time - last > SEEK_EPSILON:
+        segments.append((last, end_time, 'encode'))
+
+    work_dir = tempfile.mkdtemp(prefix='smartcut_', dir=os.path.dirname(clip_path) or None)
+    try:
+        part_paths = [os.path.join(work_dir, f"part_{i}.ts") for i in range(len(segments))]
+        list_path = os.path.join(work_dir, 'parts.txt')
+        with open(list_path, 'w') as f:
+            f.writelines(f"file '{os.path.abspath(p)}'\n" for p in part_paths)
+
+        concat = [
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-c', 'copy', '-bsf:a', 'aac_adtstoasc',
+            '-movflags', '+faststart',
+            clip_path
+        ]
+
+        with slots, encoding.core_scheduler().reserve() as threads:
+            # Un solo FFmpeg genera los tres tramos (cada uno con seek en la entrada)
+            cmd = ['ffmpeg', '-y']
+            for seg_start, seg_end, mode in segments:
+                seek = seg_start + SEEK_EPSILON if mode == 'copy' else seg_start
+                cmd += ['-ss', str(seek), '-t', str(seg_end - seg_start), '-i', video_path]
+
+            for i, (_, _, mode) in enumerate(segments):
+                if mode == 'copy':
+                    codec = ['-c:v', 'copy'] + (['-c:a', 'copy'] if audio_is_aac else audio_encode_args(index))
+                else:
+                    codec = encode_args(index, threads)
+                cmd += ['-map', f'{i}:v:0', '-map', f'{i}:a:0?', *codec, '-f', 'mpegts', part_paths[i]]
+
+            result = supervisor.run(cmd, timeout=timeout)
+            if result.returncode != 0:
+                print(f"Error en corte exacto: {result.stderr[-500:]}")
+                return False
+            result = supervisor.run(concat, timeout=timeout)
+
+        return result.returncode == 0 and os.path.exists(clip_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,285 @@
+from flask import current_app
+from ..models import Clip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: el lock sólo serializa los hilos de este proceso
+    fcntl = None
+
+# Caché de medios compartida entre usuarios, indexada por ID de YouTube.
+#
+#   <MEDIA_CACHE_DIR>/sources/<youtube_id>_<formato>.mp4   video descargado
+#   <MEDIA_CACHE_DIR>/clips/<youtube_id>_<plan>/           clips + thumbnails + manifest.json
+#   <MEDIA_CACHE_DIR>/locks/<youtube_id>.lock              flock mientras un trabajo usa el video
+#
+# Los archivos de cada video se materializan con hard links, así que el
+# conteo de links del sistema de archivos es el conteo de referencias:
+# borrar un video o desalojar una entrada nunca deja a otro sin su archivo.
+
+# Archivos derivados de cada clip que también se guardan en la caché
+PREVIEW_ATTRS = {'thumbnail_path': 'thumb', 'sprite_path': 'sprite', 'preview_path': 'preview'}
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def cache_root():
+    return current_app.config.get('MEDIA_CACHE_DIR') or os.path.join('uploads', 'cache')
+
+def fingerprint(*parts):
+    """Huella corta y estable de los parámetros que definen un resultado"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+class KeyLock:
+    """Lock por video de YouTube compartido por todos los procesos de la caché
+
+    Es un flock sobre <cache>/locks/<youtube_id>.lock, así los workers en
+    procesos o máquinas distintos con el mismo disco no descargan ni guardan
+    el mismo video a la vez. El archivo se borra al liberar.
+    """
+
+    def __init__(self, youtube_id):
+        self.youtube_id = youtube_id
+        self.path = os.path.join(cache_root(), 'locks', f"{youtube_id}.lock")
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        if fcntl is None:
+            return self._acquire_local(blocking)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+
+            # Quien tenía el lock pudo borrar el archivo al liberarlo: el lock
+            # sólo vale si sigue siendo el archivo de la ruta
+            try:
+                current = os.fstat(fd).st_ino == os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                self._fd = fd
+                return True
+            os.close(fd)
+
+    def release(self):
+        if fcntl is None:
+            self._release_local()
+            return
+
+        # Borrarlo antes de soltar el lock evita dejar un archivo por video
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def _acquire_local(self, blocking):
+        with _locks_guard:
+            entry = _locks.setdefault(self.youtube_id, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(blocking):
+            return True
+        self._unref()
+        return False
+
+    def _release_local(self):
+        _locks[self.youtube_id][0].release()
+        self._unref()
+
+    def _unref(self):
+        # Quitar del registro los locks que nadie usa ni espera
+        with _locks_guard:
+            entry = _locks[self.youtube_id]
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[self.youtube_id]
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+def key_lock(youtube_id):
+    """Lock por video de YouTube para que dos trabajos no descarguen lo mismo"""
+    return KeyLock(youtube_id)
+
+def touch(path):
+    """Marcar una entrada como usada recientemente (para el LRU)"""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+def link_or_copy(src, dst):
+    """Crear dst apuntando al mismo contenido que src (hard link o copia)"""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def source_path(youtube_id, fmt):
+    """Ruta del video descargado para un ID de YouTube y formato"""
+    sources_dir = os.path.join(cache_root(), 'sources')
+    os.makedirs(sources_dir, exist_ok=True)
+    return os.path.join(sources_dir, f"{youtube_id}_{fingerprint(fmt)}.mp4")
+
+def clip_set_dir(youtube_id, plan_fingerprint):
+    return os.path.join(cache_root(), 'clips', f"{youtube_id}_{plan_fingerprint}")
+
+def load_clip_set(youtube_id, plan_fingerprint, video_id, clips_dir, thumbnails_dir):
+    """Materializar clips ya generados para este video; None si no hay caché"""
+    entry_dir = clip_set_dir(youtube_id, plan_fingerprint)
+    manifest_path = os.path.join(entry_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    entries = manifest.get('clips', [])
+    if any(not os.path.exists(os.path.join(entry_dir, e['file'])) for e in entries):
+        return None
+
+    clips = []
+    for i, entry in enumerate(entries):
+        clip_path = os.path.join(clips_dir, f"clip_{video_id}_{i+1}{os.path.splitext(entry['file'])[1]}")
+        link_or_copy(os.path.join(entry_dir, entry['file']), clip_path)
+
+        clip = Clip(
+            file_path=clip_path,
+            duration=entry['duration'],
+            start_time=entry['start_time'],
+            end_time=entry['end_time'],
+            title=f"Clip {i+1} - {video_id}"
+        )
+
+        # Thumbnails, sprites y previews guardados junto al clip
+        previews = entry.get('previews') or {}
+        if entry.get('thumbnail'):
+            previews.setdefault('thumbnail_path', entry['thumbnail'])
+        for attr, name in previews.items():
+            cached = os.path.join(entry_dir, name)
+            if attr in PREVIEW_ATTRS and os.path.exists(cached):
+                path = os.path.join(thumbnails_dir, f"{PREVIEW_ATTRS[attr]}_{video_id}_{i+1}{os.path.splitext(name)[1]}")
+                link_or_copy(cached, path)
+                setattr(clip, attr, path)
+
+        clips.append(clip)
+
+    touch(entry_dir)
+    return clips
+
+def store_clip_set(youtube_id, plan_fingerprint, clips):
+    """Guardar en caché los clips recién generados de un video"""
+    if not clips:
+        return
+
+    entry_dir = clip_set_dir(youtube_id, plan_fingerprint)
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    entries = []
+    for i, clip in enumerate(clips):
+        entry = {
+            'file': f"clip_{i+1}{os.path.splitext(clip.file_path)[1]}",
+            'previews': {},
+            'duration': clip.duration,
+            'start_time': clip.start_time,
+            'end_time': clip.end_time
+        }
+        link_or_copy(clip.file_path, os.path.join(tmp_dir, entry['file']))
+        for attr, prefix in PREVIEW_ATTRS.items():
+            path = getattr(clip, attr)
+            if path and os.path.exists(path):
+                name = f"{prefix}_{i+1}{os.path.splitext(path)[1]}"
+                link_or_copy(path, os.path.join(tmp_dir, name))
+                entry['previews'][attr] = name
+        entries.append(entry)
+
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump({'youtube_id': youtube_id, 'clips': entries, 'created_at': time.time()}, f)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+
+def entry_size(path):
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(path, name))
+            for name in os.listdir(path)
+        )
+    return os.path.getsize(path)
+
+def evict(max_bytes=None):
+    """Desalojar las entradas menos usadas hasta quedar bajo el límite"""
+    if max_bytes is None:
+        max_bytes = current_app.config.get('MEDIA_CACHE_MAX_BYTES', 0)
+    if not max_bytes:
+        return 0
+
+    entries = []
+    for sub in ('sources', 'clips'):
+        base = os.path.join(cache_root(), sub)
+        if not os.path.isdir(base):
+            continue
+        for name in os.listdir(base):
+            path = os.path.join(base, name)
+            try:
+                entries.append((os.path.getmtime(path), entry_size(path), path, name.rsplit('_', 1)[0]))
+            except OSError:
+                continue
+
+    total = sum(size for _, size, _, _ in entries)
+    evicted = 0
+    for _, size, path, youtube_id in sorted(entries):
+        if total <= max_bytes:
+            break
+        lock = key_lock(youtube_id)
+        # Saltar entradas que otro trabajo está usando ahora mismo
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            total -= size
+            evicted += 1
+        except OSError:
+            pass
+        finally:
+            lock.release()
+
+    return evicted
+
+def release_file(path):
+    """Eliminar el archivo de un video (los hard links de los demás siguen vivos)"""
+    if not path or not os.path.exists(path):
+        return False
+
+    os.remove(path)
+    return True
@@ -0,0 +1,117 @@
+from datetime import datetime
+from .. import db
+from ..models import ProcessingJob, Video
+from . import supervisor
+import hashlib
+import json
+import threading
+
+# Progreso de los trabajos para SSE y long-poll.
+#
+# Los workers guardan etapa y porcentaje en processing_job cada pocos
+# segundos (flush); los endpoints leen una sola consulta por usuario y
+# esperan cambios con una Condition del proceso, que se despierta al
+# instante si el worker corre en el mismo proceso y, si no, al vencer el
+# intervalo de sondeo contra la base.
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+_changed = threading.Condition()
+_version = 0
+_written = {}
+_streams = {'open': 0}
+_streams_lock = threading.Lock()
+
+def notify():
+    """Despertar a los clientes en espera de este proceso"""
+    global _version
+    with _changed:
+        _version += 1
+        _changed.notify_all()
+
+def version():
+    return _version
+
+def open_stream(limit):
+    """Reservar un hilo de espera (stream SSE o long-poll); False si ya hay limit ocupados"""
+    with _streams_lock:
+        if limit and _streams['open'] >= limit:
+            return False
+        _streams['open'] += 1
+        return True
+
+def close_stream():
+    with _streams_lock:
+        _streams['open'] -= 1
+
+def wait(since, timeout):
+    """Esperar hasta que cambie la versión local o pase timeout"""
+    with _changed:
+        _changed.wait_for(lambda: _version != since, timeout)
+
+def flush(worker_id):
+    """Guardar etapa y porcentaje de los trabajos en curso de este proceso"""
+    snapshots = supervisor.running()
+    changed = {
+        video_id: snapshot for video_id, snapshot in snapshots.items()
+        if _written.get(video_id) != (snapshot['stage'], snapshot['percent'])
+    }
+
+    for video_id, snapshot in changed.items():
+        ProcessingJob.query.filter(
+            ProcessingJob.video_id == video_id,
+            ProcessingJob.worker_id == worker_id,
+            ProcessingJob.status == 'running'
+        ).update({
+            'stage': snapshot['stage'],
+            'progress': snapshot['percent'],
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+        _written[video_id] = (snapshot['stage'], snapshot['percent'])
+
+    for video_id in list(_written):
+        if video_id not in snapshots:
+            del _written[video_id]
+
+    if changed:
+        db.session.commit()
+        notify()
+    return len(changed)
+
+def job_states(user_id, ids=None, since=None):
+    """Estado compacto de los videos del usuario (una consulta)
+
+    Sin ids devuelve los videos que todavía no terminaron o, con since,
+    todos los que cambiaron desde ese momento (incluidos los que terminaron).
+    """
+    query = db.session.query(
+        Video.id, Video.status, Video.title, ProcessingJob.stage, ProcessingJob.progress,
+        Video.updated_at, ProcessingJob.updated_at
+    ).outerjoin(ProcessingJob, ProcessingJob.video_id == Video.id).filter(Video.user_id == user_id)
+
+    if ids:
+        query = query.filter(Video.id.in_(ids))
+    elif not since:
+        query = query.filter(Video.status.notin_(TERMINAL_STATUSES))
+    if since:
+        query = query.filter(db.or_(Video.updated_at > since, ProcessingJob.updated_at > since))
+
+    states = []
+    for video_id, status, title, stage, progress, video_updated, job_updated in query.order_by(Video.id).all():
+        updated_at = max(filter(None, (video_updated, job_updated)), default=None)
+        states.append({
+            'video_id': video_id,
+            'status': status,
+            'title': title,
+            'stage': stage if status not in TERMINAL_STATUSES else None,
+            'progress': progress if status not in TERMINAL_STATUSES else None,
+            'updated_at': updated_at.isoformat() if updated_at else None
+        })
+    # Liberar la conexión mientras el cliente espera
+    db.session.close()
+    return states
+
+def token(states):
+    """Huella del estado para saber si algo cambió desde la última respuesta"""
+    raw = json.dumps(states, sort_keys=True)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
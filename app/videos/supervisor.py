@@ -0,0 +1,263 @@
+from contextlib import contextmanager
+from collections import deque
+import os
+import re
+import selectors
+import signal
+import subprocess
+import threading
+import time
+
+# Supervisor de procesos hijos (yt-dlp, ffmpeg, ffprobe).
+#
+# run() reemplaza a subprocess.run(capture_output=True): lee stdout y stderr
+# a medida que llegan (de stderr sólo guarda las últimas líneas), interpreta
+# las líneas de progreso, mata el grupo de procesos completo al vencer el
+# timeout o al cancelar el trabajo y limita la cantidad de hijos simultáneos
+# del proceso.
+#
+# Cada trabajo corre dentro de job_context(video_id); los hilos auxiliares
+# (cortes en paralelo) lo heredan envolviendo sus funciones con bind().
+
+STDERR_TAIL_LINES = 200
+KILL_GRACE_SECONDS = 5
+
+_FFMPEG_TIME = re.compile(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)')
+_YTDLP_PERCENT = re.compile(r'\[download\]\s+(\d+(?:\.\d+)?)%')
+
+_slots = None
+_slots_lock = threading.Lock()
+_contexts = {}
+_contexts_lock = threading.Lock()
+_local = threading.local()
+
+class Cancelled(Exception):
+    """El trabajo fue cancelado mientras corría"""
+
+class JobContext:
+    """Estado de un trabajo en curso: cancelación, hijos vivos y progreso"""
+
+    def __init__(self, video_id):
+        self.video_id = video_id
+        self.cancelled = threading.Event()
+        self.processes = set()
+        self.stage = None
+        self.percent = None
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, process):
+        with self._lock:
+            self.processes.add(process)
+
+    def discard(self, process):
+        with self._lock:
+            self.processes.discard(process)
+
+    def kill_all(self):
+        with self._lock:
+            processes = list(self.processes)
+        for process in processes:
+            kill_group(process)
+
+    def snapshot(self):
+        return {
+            'stage': self.stage,
+            'percent': self.percent,
+            'updated_at': self.updated_at
+        }
+
+def configure(max_children):
+    """Fijar el límite global de procesos hijos (0 = 2 por núcleo)"""
+    global _slots
+    with _slots_lock:
+        _slots = threading.BoundedSemaphore(max_children or (os.cpu_count() or 1) * 2)
+
+def child_slots():
+    if _slots is None:
+        configure(0)
+    return _slots
+
+@contextmanager
+def job_context(video_id):
+    """Registrar el trabajo del hilo actual para poder cancelarlo"""
+    context = JobContext(video_id)
+    with _contexts_lock:
+        _contexts[video_id] = context
+    previous = getattr(_local, 'context', None)
+    _local.context = context
+    try:
+        yield context
+    finally:
+        _local.context = previous
+        with _contexts_lock:
+            if _contexts.get(video_id) is context:
+                del _contexts[video_id]
+
+def current():
+    return getattr(_local, 'context', None)
+
+def bind(fn):
+    """Ejecutar fn en otro hilo dentro del trabajo del hilo actual"""
+    context = current()
+
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, 'context', None)
+        _local.context = context
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.context = previous
+
+    return wrapper
+
+def cancel(video_id):
+    """Cancelar un trabajo de este proceso; False si no está corriendo aquí"""
+    with _contexts_lock:
+        context = _contexts.get(video_id)
+    if not context:
+        return False
+    context.cancelled.set()
+    context.kill_all()
+    return True
+
+def check_cancelled():
+    """Lanzar Cancelled si el trabajo del hilo actual fue cancelado"""
+    context = current()
+    if context and context.cancelled.is_set():
+        raise Cancelled(f"Video {context.video_id} cancelado")
+
+def report(stage=None, percent=None):
+    """Actualizar la etapa y el porcentaje del trabajo del hilo actual"""
+    context = current()
+    if not context:
+        return
+    if stage is not None and stage != context.stage:
+        context.stage = stage
+        context.percent = None
+    if percent is not None:
+        context.percent = round(min(max(percent, 0.0), 100.0), 1)
+    context.updated_at = time.time()
+
+def running():
+    """Etapa y porcentaje de todos los trabajos que corren en este proceso"""
+    with _contexts_lock:
+        contexts = list(_contexts.values())
+    return {context.video_id: context.snapshot() for context in contexts}
+
+def progress(video_id):
+    """Etapa y porcentaje de un trabajo que corre en este proceso"""
+    with _contexts_lock:
+        context = _contexts.get(video_id)
+    return context.snapshot() if context else None
+
+def ffmpeg_progress(total_seconds):
+    """Porcentaje a partir de las líneas time=HH:MM:SS.xx de FFmpeg"""
+    def parse(line):
+        match = _FFMPEG_TIME.search(line)
+        if not match or not total_seconds:
+            return None
+        hours, minutes, seconds = match.groups()
+        return (int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 100 / total_seconds
+    return parse
+
+def ytdlp_progress(line):
+    """Porcentaje a partir de las líneas [download] xx.x% de yt-dlp"""
+    match = _YTDLP_PERCENT.search(line)
+    return float(match.group(1)) if match else None
+
+def kill_group(process):
+    """Terminar el proceso y todos sus hijos (TERM y, si no alcanza, KILL)"""
+    if process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+def run(cmd, timeout, progress=None, binary=False):
+    """Ejecutar cmd bajo supervisión; devuelve un CompletedProcess con texto
+
+    progress es una función línea -> porcentaje (o None) que se aplica a
+    cada línea de salida; con binary=True stdout se devuelve en bytes (audio
+    PCM, por ejemplo). Lanza subprocess.TimeoutExpired o Cancelled después
+    de matar el grupo de procesos.
+    """
+    check_cancelled()
+    context = current()
+
+    with child_slots():
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+        if context:
+            context.add(process)
+
+        stdout = []
+        stderr = deque(maxlen=STDERR_TAIL_LINES)
+        partial = {process.stdout: b'', process.stderr: b''}
+        deadline = time.monotonic() + timeout
+
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(process.stderr, selectors.EVENT_READ)
+
+        try:
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    kill_group(process)
+                    raise subprocess.TimeoutExpired(cmd, timeout, b''.join(stdout), '\n'.join(stderr))
+                if context and context.cancelled.is_set():
+                    kill_group(process)
+                    raise Cancelled(f"Video {context.video_id} cancelado")
+
+                for key, _ in selector.select(timeout=min(remaining, 0.5)):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        lines = [partial[key.fileobj]] if partial[key.fileobj] else []
+                    else:
+                        if key.fileobj is process.stdout:
+                            stdout.append(chunk)
+                            if not progress:
+                                continue
+                        # FFmpeg y yt-dlp reescriben la línea de progreso con \r
+                        data = partial[key.fileobj] + chunk
+                        *lines, partial[key.fileobj] = re.split(rb'[\r\n]', data)
+
+                    for raw_line in lines:
+                        line = raw_line.decode('utf-8', errors='replace')
+                        if key.fileobj is process.stderr and line:
+                            stderr.append(line)
+                        if progress and line:
+                            percent = progress(line)
+                            if percent is not None:
+                                report(percent=percent)
+
+            process.wait(timeout=max(deadline - time.monotonic(), 1))
+        except subprocess.TimeoutExpired:
+            kill_group(process)
+            raise
+        finally:
+            selector.close()
+            process.stdout.close()
+            process.stderr.close()
+            if context:
+                context.discard(process)
+
+    output = b''.join(stdout)
+    return subprocess.CompletedProcess(
+        cmd,
+        process.returncode,
+        output if binary else output.decode('utf-8', errors='replace'),
+        '\n'.join(stderr)
+    )
@@ -0,0 +1,264 @@
+from datetime import datetime
+from flask import current_app
+from .. import db
+from ..models import Transcript
+from .clip_planner import decode_pcm
+import json
+import threading
+
+# Transcripción de clips por bloques, en lotes, con caché por ID de YouTube.
+#
+# Sólo se transcriben los tramos de las ventanas que todavía no cubre la
+# transcripción guardada del video, así que reprocesar el mismo video (o que
+# otro usuario lo envíe) no vuelve a pasar por el modelo ni duplica segmentos.
+
+SAMPLE_RATE = 16000
+
+# Planes que incluyen subtítulos personalizados
+SUBTITLE_PLANS = ('monthly', 'yearly', 'lifetime')
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+class StubBackend:
+    """Backend local sin modelo, para pruebas y desarrollo"""
+    name = 'stub'
+
+    def transcribe_batch(self, chunks):
+        return [
+            [{'start': 0.0, 'end': len(chunk) / SAMPLE_RATE, 'text': 'Transcripción de prueba'}]
+            for chunk in chunks
+        ]
+
+class WhisperBackend:
+    """openai-whisper en CPU, decodificando varios bloques por llamada"""
+    name = 'whisper'
+
+    def __init__(self, model_name, language=None):
+        import whisper
+        self.whisper = whisper
+        self.model = whisper.load_model(model_name, device='cpu')
+        self.language = language
+        self._lock = threading.Lock()
+
+    def _tokenizer(self, language):
+        from whisper.tokenizer import get_tokenizer
+        kwargs = {'language': language, 'task': 'transcribe'}
+        if hasattr(self.model, 'num_languages'):
+            kwargs['num_languages'] = self.model.num_languages
+        return get_tokenizer(self.model.is_multilingual, **kwargs)
+
+    def _segments(self, result, chunk_seconds):
+        """Convertir los tokens de marca de tiempo en segmentos"""
+        tokenizer = self._tokenizer(result.language)
+        timestamp_begin = tokenizer.timestamp_begin
+        segments = []
+        start = None
+        text_tokens = []
+
+        for token in result.tokens:
+            if token < timestamp_begin:
+                text_tokens.append(token)
+                continue
+            seconds = (token - timestamp_begin) * 0.02
+            if start is None:
+                start = seconds
+                continue
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append({'start': start, 'end': seconds, 'text': text})
+            start = None
+            text_tokens = []
+
+        text = tokenizer.decode(text_tokens).strip() if text_tokens else ''
+        if text:
+            segments.append({'start': start or 0.0, 'end': chunk_seconds, 'text': text})
+        if not segments and result.text.strip():
+            segments.append({'start': 0.0, 'end': chunk_seconds, 'text': result.text.strip()})
+        return segments
+
+    def transcribe_batch(self, chunks):
+        import torch
+
+        whisper = self.whisper
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(chunk)))
+            for chunk in chunks
+        ])
+        options = whisper.DecodingOptions(fp16=False, language=self.language)
+
+        with self._lock:
+            results = whisper.decode(self.model, mels, options)
+
+        return [
+            self._segments(result, len(chunk) / SAMPLE_RATE)
+            for result, chunk in zip(results, chunks)
+        ]
+
+def get_backend():
+    """Instancia del backend configurado (se carga una vez por proceso)"""
+    name = current_app.config.get('TRANSCRIPTION_BACKEND', 'none')
+    if name == 'none':
+        return None
+
+    with _backends_lock:
+        if name not in _backends:
+            if name == 'stub':
+                _backends[name] = StubBackend()
+            elif name == 'whisper':
+                _backends[name] = WhisperBackend(
+                    current_app.config.get('WHISPER_MODEL', 'base'),
+                    current_app.config.get('TRANSCRIPTION_LANGUAGE')
+                )
+            else:
+                raise ValueError(f"Backend de transcripción desconocido: {name}")
+        return _backends[name]
+
+def load_chunks(media_path, chunk_seconds, start=None, duration=None):
+    """Decodificar el audio a 16 kHz mono (opcionalmente un tramo) y partirlo en bloques"""
+    import numpy as np
+
+    samples = decode_pcm(media_path, SAMPLE_RATE, start, duration).astype(np.float32) / 32768.0
+
+    size = int(chunk_seconds * SAMPLE_RATE)
+    return [
+        (offset / SAMPLE_RATE, samples[offset:offset + size])
+        for offset in range(0, len(samples), size)
+        if len(samples[offset:offset + size]) > SAMPLE_RATE // 10
+    ]
+
+def transcribe_files(backend, items):
+    """Transcribir [(inicio, fin, archivo, inicio en el archivo)] en lotes; segmentos absolutos"""
+    chunk_seconds = current_app.config.get('TRANSCRIPTION_CHUNK_SECONDS', 30)
+    batch_size = current_app.config.get('TRANSCRIPTION_BATCH_SIZE', 8)
+
+    chunks = []
+    for start, end, media_path, file_start in items:
+        for chunk_offset, samples in load_chunks(media_path, chunk_seconds, file_start, end - start):
+            chunks.append((start + chunk_offset, samples))
+
+    segments = []
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        results = backend.transcribe_batch([samples for _, samples in batch])
+        for (offset, _), chunk_segments in zip(batch, results):
+            for segment in chunk_segments:
+                segments.append({
+                    'start': round(offset + segment['start'], 2),
+                    'end': round(offset + segment['end'], 2),
+                    'text': segment['text']
+                })
+    return segments
+
+def merge_ranges(ranges):
+    """Rangos [inicio, fin] ordenados y fusionados"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 0.01:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def uncovered(covered, start, end):
+    """Tramos de [start, end] fuera de los rangos fusionados de covered"""
+    gaps = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end <= cursor + 0.01:
+            continue
+        if c_start >= end - 0.01:
+            break
+        if c_start > cursor + 0.01:
+            gaps.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+    if cursor < end - 0.01:
+        gaps.append((cursor, end))
+    return gaps
+
+def ensure_transcript(youtube_id, items):
+    """Transcribir las ventanas de items que la caché aún no cubre
+
+    items es una lista de (inicio, fin, archivo, inicio en el archivo).
+    """
+    backend = get_backend()
+    if not backend or not items:
+        return None
+
+    transcript = Transcript.query.filter_by(youtube_id=youtube_id).first()
+    covered = merge_ranges(json.loads(transcript.covered)) if transcript else []
+    segments = json.loads(transcript.segments) if transcript else []
+
+    # Una ventana que se solapa en parte con lo ya transcripto sólo aporta
+    # sus tramos nuevos, leídos desde el punto equivalente del archivo
+    pending = []
+    for start, end, media_path, file_start in items:
+        for gap_start, gap_end in uncovered(covered, start, end):
+            pending.append((gap_start, gap_end, media_path, (file_start or 0) + gap_start - start))
+        covered = merge_ranges(covered + [[start, end]])
+    if not pending:
+        return transcript
+
+    segments += transcribe_files(backend, pending)
+
+    if not transcript:
+        transcript = Transcript(youtube_id=youtube_id)
+        db.session.add(transcript)
+    transcript.backend = backend.name
+    transcript.segments = json.dumps(sorted(segments, key=lambda s: s['start']))
+    transcript.covered = json.dumps(covered)
+    transcript.updated_at = datetime.utcnow()
+    db.session.commit()
+    return transcript
+
+def transcribe_clips(youtube_id, clips):
+    """Asegurar transcripción de las ventanas de los clips a partir de sus archivos"""
+    return ensure_transcript(youtube_id, [
+        (clip.start_time, clip.end_time, clip.file_path, None)
+        for clip in clips
+    ])
+
+def transcribe_source(youtube_id, windows, media_path):
+    """Asegurar transcripción de las ventanas leyendo el video original"""
+    return ensure_transcript(youtube_id, [
+        (start, end, media_path, start)
+        for start, end in windows
+    ])
+
+def segments_between(transcript, start, end):
+    """Segmentos de la transcripción dentro de [start, end], relativos a start"""
+    if not transcript:
+        return []
+    result = []
+    for segment in json.loads(transcript.segments):
+        if segment['end'] <= start or segment['start'] >= end:
+            continue
+        result.append({
+            'start': max(segment['start'], start) - start,
+            'end': min(segment['end'], end) - start,
+            'text': segment['text']
+        })
+    return result
+
+def format_timestamp(seconds, separator):
+    millis = int(round(max(seconds, 0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+def write_captions(segments, base_path):
+    """Escribir base_path.srt y base_path.vtt; devuelve la ruta del SRT"""
+    srt_lines = []
+    vtt_lines = ['WEBVTT', '']
+    for i, segment in enumerate(segments, start=1):
+        start, end = segment['start'], segment['end']
+        srt_lines += [str(i), f"{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}", segment['text'], '']
+        vtt_lines += [f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}", segment['text'], '']
+
+    srt_path = f"{base_path}.srt"
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(srt_lines))
+    with open(f"{base_path}.vtt", 'w', encoding='utf-8') as f:
+        f.write('\n'.join(vtt_lines))
+    return srt_path
@@ -1,18 +1,38 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models import Video, Clip, User
 from .. import db
+from ..pagination import paginate
+from .jobs import enqueue_job, notify_job_queue, cancel_job
+from . import media_cache, info_cache, downloader, clip_planner, transcription, keyframes, encoding, supervisor, progress
 import re
+import json
+import math
 import os
-import subprocess
 import requests
-from datetime import datetime, timedelta
-import threading
+import subprocess
+from datetime import datetime, timedelta, timezone
 import time
 from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 videos_bp = Blueprint('videos', __name__)
 
+# Formatos de descarga; forman parte de la clave de la caché de medios
+DOWNLOAD_FORMAT = 'best[height<=720]'
+AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio'
+
+# Videos por semana de cada plan (los que no aparecen no tienen límite)
+WEEKLY_LIMITS = {'free': 2, 'weekly': 5}
+
+# Estado en lote: máximo de IDs por consulta y solapamiento de ?since= (segundos)
+STATUS_BATCH_LIMIT = 200
+STATUS_SINCE_OVERLAP = 5
+
+_ffmpeg_semaphore = None
+_ffmpeg_semaphore_lock = threading.Lock()
+
 def validate_youtube_url(url):
     """Validar URL de YouTube"""
     youtube_patterns = [
@@ -40,8 +60,83 @@ def extract_video_id(url):
             return match.group(1)
     return None
 
-def get_video_info(video_id):
+def validate_playlist_url(url):
+    """Validar URL de playlist de YouTube"""
+    return bool(re.match(r'(?:https?://)?(?:www\.)?youtube\.com/(?:playlist|watch)\?.*\blist=[a-zA-Z0-9_-]+', url))
+
+def expand_playlist(playlist_url):
+    """URLs de los videos de una playlist con una sola extracción plana"""
+    if use_ytdlp_library():
+        try:
+            return [downloader.video_url(video_id) for video_id in downloader.extract_playlist(playlist_url)]
+        except Exception as e:
+            print(f"Error expandiendo playlist con yt-dlp, usando subprocess: {str(e)}")
+    
+    cmd = ['yt-dlp', '--flat-playlist', '--print', 'id', playlist_url]
+    result = supervisor.run(cmd, timeout=120)
+    if result.returncode != 0:
+        raise ValueError(f"No se pudo expandir la playlist: {result.stderr[-300:]}")
+    return [downloader.video_url(line.strip()) for line in result.stdout.splitlines() if line.strip()]
+
+def weekly_quota(user):
+    """Videos que el usuario todavía puede enviar esta semana (None = sin límite)"""
+    limit = WEEKLY_LIMITS.get(user.plan)
+    if limit is None:
+        return None
+    
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    videos_this_week = Video.query.filter(
+        Video.user_id == user.id,
+        Video.created_at >= week_ago
+    ).count()
+    return max(limit - videos_this_week, 0)
+
+def get_video_info(video_id, raw=None):
+    """Obtener información del video de YouTube (cacheada por ID)
+    
+    Si se pasa un dict en raw y hubo que extraer, raw['info'] recibe la info
+    completa de yt-dlp para reutilizarla en la descarga.
+    """
+    return info_cache.get_or_fetch(video_id, lambda vid: fetch_video_info(vid, raw))
+
+def use_ytdlp_library():
+    return downloader.available() and current_app.config.get('YTDLP_BACKEND') == 'library'
+
+def summarize_video_info(video_id, video_info):
+    return {
+        'title': video_info.get('title', f'Video {video_id}'),
+        'duration': video_info.get('duration', 0),
+        'thumbnail': video_info.get('thumbnail', ''),
+        'success': True
+    }
+
+def video_info_error(video_id, error):
+    """Resultado fallido; unavailable marca los errores que se pueden cachear"""
+    return {
+        'title': f'Video {video_id}',
+        'duration': 0,
+        'thumbnail': '',
+        'success': False,
+        'unavailable': info_cache.is_unavailable(error),
+        'error': error
+    }
+
+def fetch_video_info(video_id, raw=None):
     """Obtener información del video de YouTube usando yt-dlp"""
+    if use_ytdlp_library():
+        try:
+            video_info = downloader.extract_info(video_id)
+            if raw is not None:
+                raw['info'] = video_info
+            return summarize_video_info(video_id, video_info)
+        except supervisor.Cancelled:
+            raise
+        except Exception as e:
+            # Un video no disponible no mejora con el binario
+            if info_cache.is_unavailable(str(e)):
+                return video_info_error(video_id, str(e))
+            print(f"Error extrayendo info con yt-dlp, usando subprocess: {str(e)}")
+    
     try:
         cmd = [
             'yt-dlp',
@@ -49,47 +144,59 @@ def get_video_info(video_id):
             f'https://www.youtube.com/watch?v={video_id}'
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = supervisor.run(cmd, timeout=30)
         
         if result.returncode == 0:
             import json
             video_info = json.loads(result.stdout)
-            return {
-                'title': video_info.get('title', f'Video {video_id}'),
-                'duration': video_info.get('duration', 0),
-                'thumbnail': video_info.get('thumbnail', ''),
-                'success': True
-            }
+            return summarize_video_info(video_id, video_info)
         else:
-            return {
-                'title': f'Video {video_id}',
-                'duration': 0,
-                'thumbnail': '',
-                'success': False,
-                'error': result.stderr
-            }
+            return video_info_error(video_id, result.stderr)
+    except supervisor.Cancelled:
+        raise
     except Exception as e:
+        # Timeouts y errores de red: no se marcan como no disponibles
         return {
             'title': f'Video {video_id}',
             'duration': 0,
             'thumbnail': '',
             'success': False,
+            'unavailable': False,
             'error': str(e)
         }
 
-def download_video(video_id, output_path):
+def download_video(video_id, output_path, info=None):
     """Descargar video de YouTube usando yt-dlp"""
+    if use_ytdlp_library():
+        try:
+            if downloader.download(video_id, output_path, DOWNLOAD_FORMAT, info,
+                                   current_app.config['DOWNLOAD_TIMEOUT']):
+                return True
+        except supervisor.Cancelled:
+            raise
+        except subprocess.TimeoutExpired:
+            print(f"Descarga de {video_id} excedió el tiempo máximo")
+            return False
+        except Exception as e:
+            # Un video no disponible no mejora con el binario
+            if info_cache.is_unavailable(str(e)):
+                print(f"Video no disponible, sin descargar: {str(e)}")
+                return False
+            print(f"Error descargando con yt-dlp, usando subprocess: {str(e)}")
+    
     try:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         cmd = [
             'yt-dlp',
-            '-f', 'best[height<=720]',
+            '--newline',
+            '-f', DOWNLOAD_FORMAT,
             '-o', output_path,
             f'https://www.youtube.com/watch?v={video_id}'
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        result = supervisor.run(cmd, timeout=current_app.config['DOWNLOAD_TIMEOUT'],
+                                progress=supervisor.ytdlp_progress)
         
         if result.returncode == 0 and os.path.exists(output_path):
             return True
@@ -100,49 +207,312 @@ def download_video(video_id, output_path):
         print(f"Error en download_video: {str(e)}")
         return False
 
-def generate_clips(video_path, video_id, video_duration, clips_dir):
-    """Generar clips del video usando FFmpeg"""
+def write_window_captions(youtube_id, media_path, video_id, windows, clips_dir):
+    """Transcribir las ventanas desde el original y escribir un SRT por clip"""
     try:
-        os.makedirs(clips_dir, exist_ok=True)
-        clips = []
+        transcript = transcription.transcribe_source(youtube_id, windows, media_path)
+        if not transcript:
+            return None
+        return [
+            transcription.write_captions(
+                transcription.segments_between(transcript, start_time, end_time),
+                os.path.join(clips_dir, f"clip_{video_id}_{i+1}")
+            )
+            for i, (start_time, end_time) in enumerate(windows)
+        ]
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error preparando subtítulos, cortando sin quemar: {str(e)}")
+        return None
+
+def use_content_planner():
+    return current_app.config.get('CLIP_PLANNER', 'uniform') != 'uniform'
+
+def use_audio_first(video_duration):
+    """Analizar el audio antes de bajar cualquier video
+    
+    Siempre que se descarguen sólo las secciones (si no, el planificador nunca
+    vería el contenido) y, con descarga completa, en los videos largos.
+    """
+    if not (use_content_planner() and use_ytdlp_library() and video_duration):
+        return False
+    if current_app.config.get('DOWNLOAD_MODE') == 'sections':
+        return True
+    min_duration = current_app.config.get('AUDIO_FIRST_MIN_DURATION', 0)
+    return bool(min_duration) and video_duration >= min_duration
+
+def select_windows_from_audio(youtube_id, video_duration, info, transfer):
+    """Descargar sólo el audio y elegir en él las ventanas de los clips"""
+    audio_path = media_cache.source_path(youtube_id, AUDIO_FORMAT)
+    
+    try:
+        if os.path.exists(audio_path):
+            media_cache.touch(audio_path)
+        elif downloader.download(youtube_id, audio_path, AUDIO_FORMAT, info, current_app.config['DOWNLOAD_TIMEOUT']):
+            transfer['downloaded'] += os.path.getsize(audio_path)
+        else:
+            return None
+    except Exception as e:
+        print(f"Error descargando audio, usando ventanas uniformes: {str(e)}")
+        return None
+    
+    return plan_clips_from_media(audio_path, video_duration)
+
+def write_section_captions(youtube_id, clips):
+    """Transcribir las secciones descargadas y escribir un SRT por clip"""
+    try:
+        transcript = transcription.transcribe_clips(youtube_id, clips)
+        if not transcript:
+            return None
+        return [
+            transcription.write_captions(
+                transcription.segments_between(transcript, clip.start_time, clip.end_time),
+                os.path.splitext(clip.file_path)[0]
+            )
+            for clip in clips
+        ]
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error preparando subtítulos, secciones sin quemar: {str(e)}")
+        return None
+
+def download_clip_sections(youtube_id, video_id, windows, clips_dir, info, transfer, profile=None,
+                           burn_captions=False):
+    """Descargar sólo las ventanas de los clips; None si no es posible"""
+    if not use_ytdlp_library() or not windows:
+        return None
+    
+    try:
+        prefix = os.path.join(clips_dir, f"section_{video_id}")
+        paths, result = downloader.download_sections(
+            youtube_id, prefix, windows, DOWNLOAD_FORMAT, info, current_app.config['DOWNLOAD_TIMEOUT']
+        )
+    except Exception as e:
+        print(f"Descarga por secciones no disponible, descargando completo: {str(e)}")
+        return None
+    
+    if not all(path and os.path.exists(path) for path in paths):
+        for path in paths:
+            if path and os.path.exists(path):
+                os.remove(path)
+        return None
+    
+    sections_size = sum(os.path.getsize(path) for path in paths)
+    clips = []
+    for i, ((start_time, end_time), path) in enumerate(zip(windows, paths)):
+        clip_path = os.path.join(clips_dir, f"clip_{video_id}_{i+1}{os.path.splitext(path)[1]}")
+        os.replace(path, clip_path)
+        duration = keyframes.probe_duration(clip_path) or (end_time - start_time)
+        # yt-dlp corta con -c copy: corregir el inicio si el clip arranca en el keyframe anterior
+        start_time = keyframes.copy_cut_start(start_time, end_time, duration)
+        clips.append(Clip(
+            file_path=clip_path,
+            duration=duration,
+            start_time=start_time,
+            end_time=start_time + duration,
+            title=f"Clip {i+1} - {video_id}"
+        ))
+    
+    # Las secciones llegan sin recodificar: el perfil y los subtítulos quemados
+    # se aplican en su única codificación
+    subtitle_paths = write_section_captions(youtube_id, clips) if burn_captions else None
+    if profile or subtitle_paths:
+        for clip, subtitle_path in zip(clips, subtitle_paths or [None] * len(clips)):
+            clip.file_path = encoding.encode_file(
+                clip.file_path, profile, ffmpeg_slots(), subtitle_path
+            ) or clip.file_path
+    
+    transfer['downloaded'] += sections_size
+    transfer['saved'] = max(downloader.estimated_size(result) - sections_size, 0)
+    return clips
+
+def clip_strategy(video_duration):
+    """Cantidad y duración de los clips según la duración del video"""
+    if video_duration <= 60:  # ≤1 minuto
+        return 1, video_duration
+    elif video_duration <= 300:  # ≤5 minutos
+        return 3, 30
+    else:  # >5 minutos
+        return 5, 60
+
+def plan_clips(video_duration):
+    """Calcular las ventanas (inicio, fin) de los clips según la duración"""
+    num_clips, clip_duration = clip_strategy(video_duration)
+    return clip_planner.plan_uniform(None, video_duration, num_clips, clip_duration)
+
+def plan_clips_from_media(media_path, video_duration, video_path=None):
+    """Ventanas elegidas por el planificador configurado; None si falla"""
+    num_clips, clip_duration = clip_strategy(video_duration)
+    if not current_app.config.get('CLIP_PLANNER_SCENES'):
+        video_path = None
+    
+    try:
+        return clip_planner.plan(
+            current_app.config.get('CLIP_PLANNER'),
+            media_path, video_duration, num_clips, clip_duration, video_path
+        )
+    except Exception as e:
+        print(f"Error planificando clips, usando ventanas uniformes: {str(e)}")
+        return None
+
+def ffmpeg_slots():
+    """Semáforo global que limita los procesos ffmpeg simultáneos"""
+    global _ffmpeg_semaphore
+    if _ffmpeg_semaphore is None:
+        with _ffmpeg_semaphore_lock:
+            if _ffmpeg_semaphore is None:
+                limit = current_app.config.get('FFMPEG_CONCURRENCY') or os.cpu_count() or 1
+                _ffmpeg_semaphore = threading.BoundedSemaphore(limit)
+    return _ffmpeg_semaphore
+
+def cut_clip(video_path, clip_path, start_time, end_time, slots, subtitle_path=None, profile=None):
+    """Cortar un clip con FFmpeg respetando el límite global"""
+    if not encoding.needs_encode(profile, subtitle_path):
+        # -ss antes de -i: salta al keyframe anterior sin leer desde el principio
+        # y el clip incluye el inicio pedido (no empieza en el keyframe siguiente)
+        cmd = [
+            'ffmpeg',
+            '-ss', str(start_time),
+            '-i', video_path,
+            '-t', str(end_time - start_time),
+            '-c', 'copy',
+            '-y',
+            clip_path
+        ]
+        with slots:
+            result = supervisor.run(cmd, timeout=60)
+        return result.returncode == 0 and os.path.exists(clip_path)
+    
+    # Al recodificar, -ss antes de -i es exacto y deja los tiempos relativos
+    # al inicio del clip, que es lo que espera el filtro de subtítulos
+    with slots, encoding.core_scheduler().reserve() as threads:
+        cmd = [
+            'ffmpeg',
+            '-ss', str(start_time),
+            '-i', video_path,
+            '-t', str(end_time - start_time),
+            *encoding.codec_args(profile, subtitle_path, threads),
+            '-y',
+            clip_path
+        ]
+        result = supervisor.run(cmd, timeout=300)
+    
+    return result.returncode == 0 and os.path.exists(clip_path)
+
+def cut_clips_single_pass(video_path, clip_paths, windows, slots, subtitle_paths=None, profile=None):
+    """Cortar todos los clips en una sola invocación de FFmpeg
+    
+    Cada ventana se abre como una entrada con -ss antes de -i, así FFmpeg salta
+    directo al punto de inicio en lugar de leer el archivo desde el principio.
+    Los thumbnails quedan para generate_previews: una salida que decodifica
+    obliga a decodificar la ventana entera aunque el clip vaya con -c copy.
+    """
+    encodes = profile or subtitle_paths
+    
+    # Mismo orden que cut_clip y encode_file: primero el cupo de FFmpeg, después los hilos
+    with slots, encoding.core_scheduler().reserve() as threads:
+        cmd = ['ffmpeg', '-y']
+        for start_time, end_time in windows:
+            cmd += ['-ss', str(start_time), '-t', str(end_time - start_time), '-i', video_path]
         
-        # Estrategia de clips según duración
-        if video_duration <= 60:  # ≤1 minuto
-            num_clips = 1
-            clip_duration = video_duration
-        elif video_duration <= 300:  # ≤5 minutos
-            num_clips = 3
-            clip_duration = 30
-        else:  # >5 minutos
-            num_clips = 5
-            clip_duration = 60
-        
-        for i in range(num_clips):
-            start_time = i * (video_duration / num_clips)
-            end_time = min(start_time + clip_duration, video_duration)
-            
-            clip_filename = f"clip_{video_id}_{i+1}.mp4"
-            clip_path = os.path.join(clips_dir, clip_filename)
-            
-            # Generar clip con FFmpeg
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-ss', str(start_time),
-                '-t', str(end_time - start_time),
-                '-c', 'copy',
-                '-y',
+        for i, clip_path in enumerate(clip_paths):
+            subtitle_path = subtitle_paths[i] if subtitle_paths else None
+            cmd += [
+                '-map', f'{i}:v?', '-map', f'{i}:a?',
+                *encoding.codec_args(profile, subtitle_path, threads),
                 clip_path
             ]
+        
+        timeout = (300 if encodes else 60) * len(windows)
+        longest = max(end_time - start_time for start_time, end_time in windows)
+        result = supervisor.run(cmd, timeout=timeout, progress=supervisor.ffmpeg_progress(longest))
+    
+    if result.returncode != 0:
+        print(f"Error cortando clips en una pasada: {result.stderr[-500:]}")
+        return [False] * len(clip_paths)
+    
+    return [os.path.exists(clip_path) for clip_path in clip_paths]
+
+def generate_clips(video_path, video_id, video_duration, clips_dir, windows=None, subtitle_paths=None,
+                   profile=None):
+    """Generar clips del video usando FFmpeg
+    
+    Si se pasan subtitle_paths (uno por ventana) o un perfil de codificación,
+    los subtítulos y el escalado se aplican en el mismo FFmpeg que corta el clip.
+    """
+    try:
+        os.makedirs(clips_dir, exist_ok=True)
+        clips = []
+        
+        windows = windows or plan_clips(video_duration)
+        slots = ffmpeg_slots()
+        
+        # Duración real y keyframes del archivo descargado (cacheados en disco)
+        try:
+            index = keyframes.load_index(video_path)
+        except Exception as e:
+            print(f"Error indexando keyframes: {str(e)}")
+            index = None
+        if index and index['duration']:
+            windows = [(start, min(end, index['duration'])) for start, end in windows]
+        
+        clip_paths = [
+            os.path.join(clips_dir, f"clip_{video_id}_{i+1}.mp4")
+            for i in range(len(windows))
+        ]
+        mode = current_app.config.get('CLIP_EXTRACTION_MODE')
+        encodes = bool(profile or subtitle_paths)
+        # smart tiene prioridad sobre CLIP_EXTRACTION_MODE en los cortes sin recodificar
+        smart_cut = bool(index) and not encodes and current_app.config.get('CLIP_CUT_MODE') == 'smart'
+        max_workers = min(len(windows), current_app.config.get('CLIP_WORKERS') or os.cpu_count() or 1)
+        
+        # Los cortes en paralelo corren dentro del trabajo (cancelación) y
+        # reportan el porcentaje de clips terminados
+        done = []
+        def tracked(cut):
+            @supervisor.bind
+            def run(*args):
+                ok = cut(*args)
+                done.append(ok)
+                supervisor.report(percent=len(done) * 100 / len(windows))
+                return ok
+            return run
+        
+        if smart_cut:
+            # Cortes exactos: copia de GOPs completos y recodificación de los bordes;
+            # si fallan, el clip sale igual con un corte -c copy
+            def exact_or_copy(path, window):
+                if keyframes.smart_cut(video_path, index, window[0], window[1], path, slots):
+                    return True
+                print(f"Corte exacto falló en {window}, cortando con -c copy")
+                return cut_clip(video_path, path, window[0], window[1], slots)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0 and os.path.exists(clip_path):
+            with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+                results = list(executor.map(tracked(exact_or_copy), clip_paths, windows))
+        elif mode == 'single_pass':
+            results = cut_clips_single_pass(video_path, clip_paths, windows, slots, subtitle_paths, profile)
+        else:
+            # Cortar todos los clips en paralelo; map conserva el orden
+            with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+                results = list(executor.map(
+                    tracked(lambda path, window, subtitle_path: cut_clip(
+                        video_path, path, window[0], window[1], slots, subtitle_path, profile
+                    )),
+                    clip_paths, windows, subtitle_paths or [None] * len(windows)
+                ))
+        
+        for i, ((start_time, end_time), clip_path, ok) in enumerate(zip(windows, clip_paths, results)):
+            if ok:
+                duration = keyframes.probe_duration(clip_path) or (end_time - start_time)
+                # Con -c copy el clip puede arrancar en el keyframe anterior (en un
+                # corte exacto la duración es la pedida y el inicio no cambia)
+                if not encodes:
+                    start_time = keyframes.copy_cut_start(start_time, end_time, duration)
                 clip = Clip(
                     file_path=clip_path,
-                    duration=end_time - start_time,
+                    duration=duration,
                     start_time=start_time,
-                    end_time=end_time,
+                    end_time=start_time + duration,
                     title=f"Clip {i+1} - {video_id}"
                 )
                 clips.append(clip)
@@ -152,6 +522,70 @@ def generate_clips(video_path, video_id, video_duration, clips_dir):
         print(f"Error generando clips: {str(e)}")
         return []
 
+PREVIEW_FILES = {
+    'thumbnail_path': ('thumb', 'jpg'),
+    'sprite_path': ('sprite', 'jpg'),
+    'preview_path': ('preview', 'webp')
+}
+
+def preview_output_args(kind, duration):
+    """Parámetros de salida de cada tipo de vista previa"""
+    if kind == 'thumbnail_path':
+        # Evitar el primer cuadro, que suele ser negro o una transición
+        return ['-ss', str(min(1.0, duration / 2)), '-frames:v', '1', '-q:v', '3']
+    if kind == 'sprite_path':
+        fps = 9 / max(duration, 1)
+        return ['-vf', f"fps={fps},scale=160:-2,tile=3x3", '-frames:v', '1', '-q:v', '4']
+    return [
+        '-t', str(min(3.0, duration)),
+        '-vf', 'fps=10,scale=320:-2',
+        '-c:v', 'libwebp', '-loop', '0', '-q:v', '60', '-an'
+    ]
+
+def generate_previews(sources, video_id, thumbnails_dir, clips):
+    """Thumbnails (y sprites / previews WebP) de todos los clips en un solo FFmpeg
+    
+    sources tiene un (archivo, inicio, duración) por clip; cada uno entra con
+    -ss antes de -i, así el original se lee sólo en las ventanas de los clips.
+    """
+    extras = [
+        kind for kind in ('sprite_path', 'preview_path')
+        if kind.split('_')[0] in current_app.config.get('THUMBNAIL_EXTRAS', ())
+    ]
+    wanted = [
+        [kind for kind in ['thumbnail_path'] + extras if not getattr(clip, kind)]
+        for clip in clips
+    ]
+    if not any(wanted):
+        return
+    
+    os.makedirs(thumbnails_dir, exist_ok=True)
+    cmd = ['ffmpeg', '-y']
+    inputs = []
+    for i, (path, start_time, duration) in enumerate(sources):
+        if wanted[i]:
+            cmd += ['-ss', str(start_time), '-t', str(duration), '-i', path]
+            inputs.append(i)
+    
+    outputs = []
+    for input_index, i in enumerate(inputs):
+        duration = sources[i][2]
+        for kind in wanted[i]:
+            prefix, ext = PREVIEW_FILES[kind]
+            output_path = os.path.join(thumbnails_dir, f"{prefix}_{video_id}_{i+1}.{ext}")
+            cmd += ['-map', f'{input_index}:v:0', *preview_output_args(kind, duration), output_path]
+            outputs.append((clips[i], kind, output_path))
+    
+    with ffmpeg_slots():
+        result = supervisor.run(cmd, timeout=60 + 30 * len(inputs))
+    
+    if result.returncode != 0:
+        print(f"Error generando vistas previas: {result.stderr[-500:]}")
+    
+    for clip, kind, output_path in outputs:
+        if os.path.exists(output_path):
+            setattr(clip, kind, output_path)
+
 def generate_thumbnail(video_path, video_id, thumbnails_dir):
     """Generar thumbnail del video"""
     try:
@@ -167,7 +601,7 @@ def generate_thumbnail(video_path, video_id, thumbnails_dir):
             thumbnail_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = supervisor.run(cmd, timeout=30)
         
         if result.returncode == 0 and os.path.exists(thumbnail_path):
             return thumbnail_path
@@ -180,7 +614,7 @@ def generate_thumbnail(video_path, video_id, thumbnails_dir):
 def process_video_async(video_id, user_id, video_url):
     """Procesar video de forma asíncrona"""
     try:
-        with db.app.app_context():
+        with current_app.app_context():
             video = Video.query.get(video_id)
             if not video:
                 return
@@ -191,52 +625,201 @@ def process_video_async(video_id, user_id, video_url):
             
             # Crear directorios
             uploads_dir = 'uploads'
-            videos_dir = os.path.join(uploads_dir, 'videos')
             clips_dir = os.path.join(uploads_dir, 'clips')
             thumbnails_dir = os.path.join(uploads_dir, 'thumbnails')
             
-            os.makedirs(videos_dir, exist_ok=True)
             os.makedirs(clips_dir, exist_ok=True)
             os.makedirs(thumbnails_dir, exist_ok=True)
             
             # Obtener información del video
-            video_info = get_video_info(extract_video_id(video_url))
+            youtube_id = extract_video_id(video_url)
+            raw_info = {}
+            supervisor.report('info')
+            video_info = get_video_info(youtube_id, raw_info)
+            supervisor.check_cancelled()
+            
+            # Sin metadatos (o con un "no disponible" cacheado) no hay nada que descargar
+            if video_info.get('unavailable') or not video_info['success']:
+                video.status = 'failed'
+                db.session.commit()
+                print(f"Video {video_id} no disponible: {video_info.get('error', '')[-300:]}")
+                return
+            
             video.title = video_info['title']
             video.status = 'processing'
             db.session.commit()
             
-            # Descargar video
-            video_filename = f"video_{video_id}.mp4"
-            video_path = os.path.join(videos_dir, video_filename)
+            # La caché se comparte entre usuarios: mismo video, mismo formato y plan
+            duration = video_info['duration']
+            audio_first = use_audio_first(duration)
+            download_mode = 'sections' if audio_first else current_app.config.get('DOWNLOAD_MODE')
+            windows = plan_clips(duration)
+            plan_fingerprint = media_cache.fingerprint(
+                DOWNLOAD_FORMAT,
+                'audio' if audio_first else windows,
+                current_app.config.get('CLIP_EXTRACTION_MODE'),
+                download_mode,
+                current_app.config.get('CLIP_PLANNER'),
+                current_app.config.get('CLIP_PLANNER_SCENES')
+            )
+            transfer = {'downloaded': 0, 'saved': 0}
+            
+            # Perfil de codificación elegido al encolar el trabajo
+            profile_name = video.job.encode_profile if video.job else None
+            profile = encoding.get_profile(profile_name)
+            if profile:
+                plan_fingerprint = media_cache.fingerprint(plan_fingerprint, profile_name)
             
-            if download_video(extract_video_id(video_url), video_path):
-                # Generar clips
-                clips = generate_clips(video_path, video_id, video_info['duration'], clips_dir)
+            # Subtítulos sólo para planes que los incluyen
+            user = User.query.get(user_id)
+            wants_captions = bool(user and user.plan in transcription.SUBTITLE_PLANS)
+            burn_captions = wants_captions and current_app.config.get('CAPTION_BURN_IN')
+            if burn_captions:
+                plan_fingerprint = media_cache.fingerprint(plan_fingerprint, 'captions')
+            
+            with media_cache.key_lock(youtube_id):
+                clips = media_cache.load_clip_set(youtube_id, plan_fingerprint, video_id, clips_dir, thumbnails_dir)
+                
+                if clips is None:
+                    video_path = None
+                    
+                    # Elegir las ventanas sobre el audio antes de bajar video
+                    if audio_first:
+                        supervisor.report('analyzing')
+                        windows = select_windows_from_audio(
+                            youtube_id, duration, raw_info.get('info'), transfer
+                        ) or windows
+                    
+                    # Descargar sólo las ventanas de los clips si es posible
+                    if download_mode == 'sections' and duration:
+                        supervisor.report('downloading')
+                        clips = download_clip_sections(
+                            youtube_id, video_id, windows, clips_dir, raw_info.get('info'), transfer, profile,
+                            burn_captions
+                        )
+                    
+                    if clips is None:
+                        # Descargar video completo (o reutilizar el ya descargado)
+                        video_path = media_cache.source_path(youtube_id, DOWNLOAD_FORMAT)
+                        supervisor.report('downloading')
+                        
+                        if os.path.exists(video_path):
+                            media_cache.touch(video_path)
+                            transfer['saved'] = os.path.getsize(video_path)
+                        elif download_video(youtube_id, video_path, raw_info.get('info')):
+                            transfer['downloaded'] += os.path.getsize(video_path)
+                        else:
+                            supervisor.check_cancelled()
+                            video.status = 'failed'
+                            db.session.commit()
+                            print(f"Error procesando video {video_id}")
+                            return
+                        
+                        # Duración real según ffprobe en lugar de la de yt-dlp
+                        try:
+                            index = keyframes.load_index(video_path)
+                        except Exception as e:
+                            print(f"Error indexando keyframes: {str(e)}")
+                            index = None
+                        if index and index['duration'] and not audio_first:
+                            duration = index['duration']
+                            windows = plan_clips(duration)
+                        
+                        # Con el video completo a mano, elegir ventanas por contenido
+                        if use_content_planner() and not audio_first:
+                            windows = plan_clips_from_media(video_path, duration, video_path) or windows
+                        
+                        # Transcribir antes de cortar para quemar los subtítulos en el mismo paso
+                        subtitle_paths = None
+                        if burn_captions:
+                            subtitle_paths = write_window_captions(
+                                youtube_id, video_path, video_id, windows, clips_dir
+                            )
+                        
+                        # Generar clips
+                        supervisor.report('cutting')
+                        clips = generate_clips(
+                            video_path, video_id, duration, clips_dir, windows, subtitle_paths, profile
+                        )
+                    
+                    supervisor.check_cancelled()
+                    
+                    # Sin ningún clip el video no se da por completado
+                    if not clips:
+                        video.status = 'failed'
+                        db.session.commit()
+                        print(f"Video {video_id} sin clips generados")
+                        return
+                    
+                    # Vistas previas de todos los clips en un solo FFmpeg: desde el
+                    # original si los clips no se recodificaron, si no desde cada clip
+                    if video_path and not profile and not burn_captions:
+                        sources = [(video_path, clip.start_time, clip.duration) for clip in clips]
+                    else:
+                        sources = [(clip.file_path, 0, clip.duration) for clip in clips]
+                    supervisor.report('previews')
+                    try:
+                        generate_previews(sources, video_id, thumbnails_dir, clips)
+                    except Exception as e:
+                        print(f"Error generando vistas previas: {str(e)}")
+                    
+                    # Último recurso: un thumbnail compartido
+                    if clips and any(not clip.thumbnail_path for clip in clips):
+                        thumbnail_path = generate_thumbnail(video_path or clips[0].file_path, video_id, thumbnails_dir)
+                        for clip in clips:
+                            if thumbnail_path and not clip.thumbnail_path:
+                                clip.thumbnail_path = thumbnail_path
+                    
+                    supervisor.check_cancelled()
+                    media_cache.store_clip_set(youtube_id, plan_fingerprint, clips)
                 
-                # Generar thumbnail
-                thumbnail_path = generate_thumbnail(video_path, video_id, thumbnails_dir)
+                # Transcribir los clips y guardar SRT/VTT junto a cada uno
+                if wants_captions:
+                    supervisor.report('transcribing')
+                    try:
+                        transcript = transcription.transcribe_clips(youtube_id, clips)
+                        for clip in clips:
+                            clip.subtitles_path = transcription.write_captions(
+                                transcription.segments_between(transcript, clip.start_time, clip.end_time),
+                                os.path.splitext(clip.file_path)[0]
+                            )
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"Error transcribiendo video {video_id}: {str(e)}")
+                
+                supervisor.check_cancelled()
                 
                 # Guardar clips en base de datos
                 for clip in clips:
                     clip.video_id = video_id
-                    if thumbnail_path:
-                        clip.thumbnail_path = thumbnail_path
                     db.session.add(clip)
                 
                 # Actualizar video
                 video.status = 'completed'
+                if video.job:
+                    video.job.bytes_downloaded = transfer['downloaded']
+                    video.job.bytes_saved = transfer['saved']
                 db.session.commit()
+            
+            media_cache.evict()
+            print(f"Video {video_id} procesado exitosamente "
+                  f"({transfer['downloaded']} bytes descargados, {transfer['saved']} ahorrados)")
                 
-                print(f"Video {video_id} procesado exitosamente")
-            else:
-                video.status = 'failed'
-                db.session.commit()
-                print(f"Error procesando video {video_id}")
-                
+    except supervisor.Cancelled:
+        print(f"Video {video_id} cancelado")
+        try:
+            with current_app.app_context():
+                db.session.rollback()
+                video = Video.query.get(video_id)
+                if video:
+                    video.status = 'cancelled'
+                    db.session.commit()
+        except:
+            pass
     except Exception as e:
         print(f"Error en process_video_async: {str(e)}")
         try:
-            with db.app.app_context():
+            with current_app.app_context():
                 video = Video.query.get(video_id)
                 if video:
                     video.status = 'failed'
@@ -260,22 +843,18 @@ def process_video():
         if not validate_youtube_url(video_url):
             return jsonify({'error': 'URL de YouTube inválida'}), 400
         
+        profile = data.get('profile', 'source')
+        if profile not in encoding.PROFILES:
+            return jsonify({'error': 'Perfil de codificación inválido'}), 400
+        
         # Verificar límites del plan
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'Usuario no encontrado'}), 404
         
         # Verificar límites semanales
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        videos_this_week = Video.query.filter(
-            Video.user_id == user_id,
-            Video.created_at >= week_ago
-        ).count()
-        
-        if user.plan == 'free' and videos_this_week >= 2:
-            return jsonify({'error': 'Límite semanal alcanzado (2 videos)'}), 429
-        elif user.plan == 'weekly' and videos_this_week >= 5:
-            return jsonify({'error': 'Límite semanal alcanzado (5 videos)'}), 429
+        if weekly_quota(user) == 0:
+            return jsonify({'error': f'Límite semanal alcanzado ({WEEKLY_LIMITS[user.plan]} videos)'}), 429
         
         # Crear video en base de datos
         video = Video(
@@ -285,15 +864,12 @@ def process_video():
         )
         
         db.session.add(video)
-        db.session.commit()
+        db.session.flush()
         
-        # Iniciar procesamiento asíncrono
-        thread = threading.Thread(
-            target=process_video_async,
-            args=(video.id, user_id, video_url)
-        )
-        thread.daemon = True
-        thread.start()
+        # Encolar procesamiento asíncrono en el mismo commit
+        enqueue_job(video, video_url, profile)
+        db.session.commit()
+        notify_job_queue(current_app)
         
         return jsonify({
             'message': 'Video agregado a la cola de procesamiento',
@@ -305,17 +881,115 @@ def process_video():
         print(f"Error en process_video: {str(e)}")
         return jsonify({'error': 'Error interno del servidor'}), 500
 
+@videos_bp.route('/process/batch', methods=['POST'])
+@jwt_required()
+def process_videos_batch():
+    """Procesar una lista de videos o una playlist de YouTube en un solo pedido"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        if not data or not (data.get('video_urls') or data.get('playlist_url')):
+            return jsonify({'error': 'Lista de URLs o URL de playlist requerida'}), 400
+        
+        profile = data.get('profile', 'source')
+        if profile not in encoding.PROFILES:
+            return jsonify({'error': 'Perfil de codificación inválido'}), 400
+        
+        user = User.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'Usuario no encontrado'}), 404
+        
+        # Sin cuota no se expande nada: la playlist es una extracción de red
+        if weekly_quota(user) == 0:
+            return jsonify({
+                'error': f'Límite semanal alcanzado ({WEEKLY_LIMITS[user.plan]} videos)',
+                'remaining': 0
+            }), 403
+        
+        if data.get('playlist_url'):
+            if not validate_playlist_url(data['playlist_url']):
+                return jsonify({'error': 'URL de playlist inválida'}), 400
+            try:
+                video_urls = expand_playlist(data['playlist_url'])
+            except Exception as e:
+                print(f"Error expandiendo playlist: {str(e)}")
+                return jsonify({'error': 'No se pudo leer la playlist'}), 502
+        else:
+            video_urls = data['video_urls']
+            if not isinstance(video_urls, list):
+                return jsonify({'error': 'video_urls debe ser una lista'}), 400
+            invalid = [url for url in video_urls if not isinstance(url, str) or not validate_youtube_url(url)]
+            if invalid:
+                return jsonify({'error': 'URLs de YouTube inválidas', 'invalid_urls': invalid[:20]}), 400
+        
+        # Sin duplicados dentro del mismo lote, conservando el orden
+        unique = {}
+        for url in video_urls:
+            unique.setdefault(extract_video_id(url), url)
+        video_urls = list(unique.values())
+        
+        if not video_urls:
+            return jsonify({'error': 'No hay videos para procesar'}), 400
+        
+        max_videos = current_app.config.get('BATCH_MAX_VIDEOS', 100)
+        if len(video_urls) > max_videos:
+            return jsonify({'error': f'Máximo {max_videos} videos por lote'}), 400
+        
+        # Cuota semanal verificada una sola vez para todo el lote
+        remaining = weekly_quota(user)
+        if remaining is not None and len(video_urls) > remaining:
+            return jsonify({
+                'error': f'Límite semanal insuficiente ({remaining} videos disponibles)',
+                'remaining': remaining
+            }), 429
+        
+        # Todos los videos y sus trabajos en una sola transacción
+        videos = [
+            Video(user_id=user_id, youtube_url=video_url, status='queued')
+            for video_url in video_urls
+        ]
+        db.session.add_all(videos)
+        db.session.flush()
+        
+        for video in videos:
+            enqueue_job(video, video.youtube_url, profile)
+        db.session.commit()
+        notify_job_queue(current_app)
+        
+        return jsonify({
+            'message': f'{len(videos)} videos agregados a la cola de procesamiento',
+            'video_ids': [video.id for video in videos],
+            'status': 'queued'
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error en process_videos_batch: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+@videos_bp.route('/profiles', methods=['GET'])
+def get_profiles():
+    """Perfiles de codificación disponibles para /process"""
+    return jsonify({
+        'profiles': encoding.PROFILES
+    }), 200
+
 @videos_bp.route('/list', methods=['GET'])
 @jwt_required()
 def get_videos():
-    """Obtener lista de videos del usuario"""
+    """Obtener lista de videos del usuario (paginada con ?cursor= y ?limit=)"""
     try:
         user_id = get_jwt_identity()
         
-        videos = Video.query.filter_by(user_id=user_id).order_by(Video.created_at.desc()).all()
+        try:
+            videos, next_cursor = paginate(Video.query.filter_by(user_id=user_id), Video)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         return jsonify({
-            'videos': [video.to_dict() for video in videos]
+            'videos': [video.to_dict() for video in videos],
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -354,14 +1028,17 @@ def delete_video(video_id):
         if not video:
             return jsonify({'error': 'Video no encontrado'}), 404
         
-        # Eliminar archivos físicos
+        # Eliminar archivos físicos (la caché conserva su propia copia)
         try:
             if video.clips:
                 for clip in video.clips:
-                    if clip.file_path and os.path.exists(clip.file_path):
-                        os.remove(clip.file_path)
-                    if clip.thumbnail_path and os.path.exists(clip.thumbnail_path):
-                        os.remove(clip.thumbnail_path)
+                    media_cache.release_file(clip.file_path)
+                    media_cache.release_file(clip.thumbnail_path)
+                    media_cache.release_file(clip.sprite_path)
+                    media_cache.release_file(clip.preview_path)
+                    if clip.subtitles_path:
+                        media_cache.release_file(clip.subtitles_path)
+                        media_cache.release_file(os.path.splitext(clip.subtitles_path)[0] + '.vtt')
         except Exception as e:
             print(f"Error eliminando archivos: {str(e)}")
         
@@ -377,6 +1054,181 @@ def delete_video(video_id):
         print(f"Error en delete_video: {str(e)}")
         return jsonify({'error': 'Error interno del servidor'}), 500
 
+@videos_bp.route('/<int:video_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_video(video_id):
+    """Cancelar el procesamiento de un video en cola o en curso"""
+    try:
+        user_id = get_jwt_identity()
+        
+        video = Video.query.filter_by(id=video_id, user_id=user_id).first()
+        
+        if not video:
+            return jsonify({'error': 'Video no encontrado'}), 404
+        
+        if not video.job or not cancel_job(video.job):
+            return jsonify({'error': 'El video no se está procesando'}), 409
+        
+        return jsonify({
+            'message': 'Cancelación solicitada',
+            'video_id': video.id,
+            'status': video.status
+        }), 202
+        
+    except Exception as e:
+        print(f"Error en cancel_video: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+def parse_ids(raw):
+    """Lista de IDs de video a partir de '1,2,3' (None si viene vacía)"""
+    if not raw:
+        return None
+    return [int(value) for value in raw.split(',') if value.strip()]
+
+@videos_bp.route('/progress', methods=['GET'])
+@jwt_required()
+def get_progress():
+    """Long-poll del progreso: responde cuando cambia el estado o vence ?wait=
+    
+    ?ids=1,2 limita a esos videos (sin ids, los que no terminaron) y ?since=
+    es el token de la respuesta anterior.
+    """
+    try:
+        user_id = get_jwt_identity()
+        try:
+            ids = parse_ids(request.args.get('ids'))
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            return jsonify({'error': 'Parámetros inválidos'}), 400
+        if not math.isfinite(wait):
+            return jsonify({'error': 'Parámetros inválidos'}), 400
+        wait = min(max(wait, 0), 60)
+        since = request.args.get('since')
+        
+        # La espera ocupa un hilo del servidor como un stream SSE y cuenta contra
+        # el mismo cupo; sin lugar se responde ya con el estado actual
+        waiting = wait > 0 and progress.open_stream(current_app.config.get('PROGRESS_MAX_STREAMS', 4))
+        if not waiting:
+            wait = 0
+        
+        poll_interval = current_app.config.get('PROGRESS_POLL_INTERVAL', 2)
+        deadline = time.monotonic() + wait
+        try:
+            while True:
+                local_version = progress.version()
+                states = progress.job_states(user_id, ids)
+                token = progress.token(states)
+                remaining = deadline - time.monotonic()
+                if token != since or remaining <= 0:
+                    break
+                progress.wait(local_version, min(poll_interval, remaining))
+        finally:
+            if waiting:
+                progress.close_stream()
+        
+        return jsonify({
+            'videos': states,
+            'token': token
+        }), 200
+        
+    except Exception as e:
+        print(f"Error en get_progress: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+@videos_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def progress_events():
+    """Stream SSE con el progreso de los videos del usuario (?ids=1,2 opcional)
+    
+    Acepta el token en ?jwt= porque EventSource no puede mandar headers.
+    """
+    try:
+        user_id = get_jwt_identity()
+        try:
+            ids = parse_ids(request.args.get('ids'))
+        except ValueError:
+            return jsonify({'error': 'Parámetros inválidos'}), 400
+        
+        poll_interval = current_app.config.get('PROGRESS_POLL_INTERVAL', 2)
+        lifetime = current_app.config.get('PROGRESS_STREAM_SECONDS', 300)
+        
+        # Cada stream ocupa un hilo del servidor: dejar hilos libres para la API
+        if not progress.open_stream(current_app.config.get('PROGRESS_MAX_STREAMS', 4)):
+            response = jsonify({'error': 'Demasiados streams abiertos, usa /videos/progress'})
+            response.headers['Retry-After'] = str(int(poll_interval * 5))
+            return response, 503
+        
+        def stream():
+            deadline = time.monotonic() + lifetime
+            last_token = None
+            last_sent = time.monotonic()
+            yield f"retry: {int(poll_interval * 1000)}\n\n"
+            
+            while time.monotonic() < deadline:
+                local_version = progress.version()
+                states = progress.job_states(user_id, ids)
+                token = progress.token(states)
+                
+                if token != last_token:
+                    yield f"id: {token}\nevent: progress\ndata: {json.dumps({'videos': states})}\n\n"
+                    last_token = token
+                    last_sent = time.monotonic()
+                    # Con ids fijos, terminar cuando todos llegaron a un estado final
+                    if ids and all(state['status'] in progress.TERMINAL_STATUSES for state in states):
+                        yield "event: done\ndata: {}\n\n"
+                        return
+                elif time.monotonic() - last_sent >= 15:
+                    # Comentario para que proxies no cierren la conexión inactiva
+                    yield ": keepalive\n\n"
+                    last_sent = time.monotonic()
+                
+                progress.wait(local_version, poll_interval)
+        
+        response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+        response.call_on_close(progress.close_stream)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        print(f"Error en progress_events: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+@videos_bp.route('/status', methods=['GET'])
+@jwt_required()
+def get_videos_status():
+    """Estado de varios videos en una consulta
+    
+    ?ids=1,2,3 pide esos videos; sin ids, los que no terminaron. ?since= (el
+    as_of de la respuesta anterior) devuelve sólo los que cambiaron desde entonces.
+    """
+    try:
+        user_id = get_jwt_identity()
+        try:
+            ids = parse_ids(request.args.get('ids'))
+            since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        except ValueError:
+            return jsonify({'error': 'Parámetros inválidos'}), 400
+        
+        if since and since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        if ids and len(ids) > STATUS_BATCH_LIMIT:
+            return jsonify({'error': f'Máximo {STATUS_BATCH_LIMIT} videos por consulta'}), 400
+        
+        # Margen para cambios que otro proceso confirma después de la consulta
+        as_of = datetime.utcnow() - timedelta(seconds=STATUS_SINCE_OVERLAP)
+        states = progress.job_states(user_id, ids, since)
+        
+        return jsonify({
+            'videos': states,
+            'as_of': as_of.isoformat()
+        }), 200
+        
+    except Exception as e:
+        print(f"Error en get_videos_status: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
 @videos_bp.route('/status/<int:video_id>', methods=['GET'])
 @jwt_required()
 def get_video_status(video_id):
@@ -396,6 +1248,21 @@ def get_video_status(video_id):
             'created_at': video.created_at.isoformat() if video.created_at else None
         }
         
+        # Etapa y porcentaje: en vivo si el trabajo corre en este proceso,
+        # si no el último guardado por el worker
+        job_progress = supervisor.progress(video.id)
+        if not job_progress and video.job and video.status not in progress.TERMINAL_STATUSES:
+            job_progress = {'stage': video.job.stage, 'percent': video.job.progress}
+        if job_progress:
+            response['progress'] = job_progress
+        
+        # Bytes bajados y ahorrados (caché o descarga por secciones) del trabajo
+        if video.job and video.status == 'completed':
+            response['transfer'] = {
+                'bytes_downloaded': video.job.bytes_downloaded,
+                'bytes_saved': video.job.bytes_saved or 0
+            }
+        
         if video.status == 'completed':
             response['clips_count'] = len(video.clips)
             response['clips'] = [clip.to_dict() for clip in video.clips]
@@ -409,15 +1276,20 @@ def get_video_status(video_id):
 @videos_bp.route('/clips', methods=['GET'])
 @jwt_required()
 def get_clips():
-    """Obtener todos los clips del usuario"""
+    """Obtener los clips del usuario (paginados con ?cursor= y ?limit=)"""
     try:
         user_id = get_jwt_identity()
         
-        clips = Clip.query.join(Video).filter(Video.user_id == user_id).all()
+        try:
+            clips, next_cursor = paginate(Clip.query.join(Video).filter(Video.user_id == user_id), Clip)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
         
         return jsonify({
             'clips': [clip.to_dict() for clip in clips],
-            'total': len(clips)
+            # Clips de esta página: con cursor no hay total del usuario
+            'count': len(clips),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extracción de clips: un ffmpeg por clip vs. una sola pasada
+
+Uso: python bench_clips.py [duración]   (por defecto 1800s)
+
+Medido con un video sintético de 30 min (1280x720, 5 clips de 60s, -c copy,
+thumbnails incluidos) en una máquina de 1 núcleo:
+    per_clip      2.15s
+    single_pass   1.59s
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ['EMBEDDED_WORKERS'] = 'false'
+
+from app import create_app
+from app.videos.video_routes import plan_clips, generate_clips, generate_previews
+
+def make_source(path, duration):
+    """Generar un video sintético de la duración indicada"""
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size=1280x720:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60',
+        '-c:a', 'aac',
+        path
+    ]
+    subprocess.run(cmd, capture_output=True, check=True)
+
+def run_mode(app, mode, source, duration, workdir):
+    """Medir el tiempo de generate_clips (más sus thumbnails) en el modo indicado"""
+    clips_dir = os.path.join(workdir, mode, 'clips')
+    thumbnails_dir = os.path.join(workdir, mode, 'thumbnails')
+    app.config['CLIP_EXTRACTION_MODE'] = mode
+    # Sólo -c copy: el corte exacto (smart) reemplaza al modo de extracción
+    app.config['CLIP_CUT_MODE'] = 'copy'
+    
+    with app.app_context():
+        start = time.perf_counter()
+        clips = generate_clips(source, 1, duration, clips_dir)
+        sources = [(source, clip.start_time, clip.duration) for clip in clips]
+        generate_previews(sources, 1, thumbnails_dir, clips)
+        elapsed = time.perf_counter() - start
+    
+    return elapsed, len(clips)
+
+def main():
+    duration = int(sys.argv[1]) if len(sys.argv) > 1 else 1800
+    app = create_app()
+    workdir = tempfile.mkdtemp(prefix='bench_clips_')
+    
+    try:
+        source = os.path.join(workdir, 'source.mp4')
+        print(f"🎬 Generando video de prueba de {duration}s...")
+        make_source(source, duration)
+        print(f"   Ventanas: {plan_clips(duration)}")
+        
+        for mode in ('per_clip', 'single_pass'):
+            elapsed, count = run_mode(app, mode, source, duration, workdir)
+            print(f"⏱️  {mode:<12} {elapsed:8.2f}s  ({count} clips)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las consultas más frecuentes antes y después de los índices
+
+Crea una base SQLite con el esquema de la app, la llena con datos sintéticos
+y mide cada consulta (mediana de varias corridas) mostrando su plan, primero
+sin índices y luego con los de la migración 5ad72d5a0508.
+
+Uso: python bench_queries.py [videos] [ruta.db]
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE user (
+    id INTEGER PRIMARY KEY, email VARCHAR(120) UNIQUE NOT NULL, password VARCHAR(255) NOT NULL,
+    plan VARCHAR(20), created_at DATETIME
+);
+CREATE TABLE video (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES user(id), youtube_url VARCHAR(500) NOT NULL,
+    title VARCHAR(200), status VARCHAR(20), created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE clip (
+    id INTEGER PRIMARY KEY, video_id INTEGER NOT NULL REFERENCES video(id), file_path VARCHAR(500),
+    thumbnail_path VARCHAR(500), duration FLOAT, start_time FLOAT, end_time FLOAT, title VARCHAR(200),
+    created_at DATETIME
+);
+"""
+
+# Mismos índices que la migración
+INDEXES = """
+CREATE INDEX ix_video_user_id_created_at ON video (user_id, created_at);
+CREATE INDEX ix_video_created_at ON video (created_at);
+CREATE INDEX ix_video_status ON video (status);
+CREATE INDEX ix_clip_video_id ON clip (video_id);
+CREATE INDEX ix_user_created_at ON user (created_at);
+"""
+
+QUERIES = {
+    'cuota semanal (/process)':
+        "SELECT count(*) FROM video WHERE user_id = :user_id AND created_at >= :week_ago",
+    'videos del usuario (/videos/list)':
+        "SELECT video.*, (SELECT count(clip.id) FROM clip WHERE clip.video_id = video.id) "
+        "FROM video WHERE user_id = :user_id ORDER BY created_at DESC",
+    'clips del usuario (/videos/clips)':
+        "SELECT clip.* FROM clip JOIN video ON video.id = clip.video_id WHERE video.user_id = :user_id",
+    'página de admin (/admin/videos)':
+        "SELECT video.*, user.email FROM video JOIN user ON user.id = video.user_id "
+        "ORDER BY video.created_at DESC LIMIT 20",
+    'usuarios nuevos (/admin/stats)':
+        "SELECT count(*) FROM user WHERE created_at >= :week_ago",
+}
+
+STATUSES = ['completed'] * 8 + ['failed', 'queued']
+
+def seed(conn, num_videos, num_users):
+    """Usuarios, videos repartidos en un año y 3 clips por video"""
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    conn.executemany(
+        "INSERT INTO user (id, email, password, plan, created_at) VALUES (?, ?, 'x', 'free', ?)",
+        ((i, f"user{i}@example.com", now - timedelta(days=rng.random() * 365)) for i in range(1, num_users + 1))
+    )
+
+    batch = 100000
+    for offset in range(0, num_videos, batch):
+        videos = []
+        clips = []
+        for video_id in range(offset + 1, min(offset + batch, num_videos) + 1):
+            created_at = now - timedelta(days=rng.random() * 365)
+            videos.append((video_id, rng.randint(1, num_users), f"https://youtu.be/{video_id}",
+                           rng.choice(STATUSES), created_at))
+            for i in range(3):
+                clips.append((video_id, f"clip_{video_id}_{i+1}.mp4", 30.0, created_at))
+        conn.executemany(
+            "INSERT INTO video (id, user_id, youtube_url, status, created_at) VALUES (?, ?, ?, ?, ?)", videos
+        )
+        conn.executemany(
+            "INSERT INTO clip (video_id, file_path, duration, created_at) VALUES (?, ?, ?, ?)", clips
+        )
+        conn.commit()
+
+def measure(conn, sql, params, runs=5):
+    """Plan de la consulta y mediana de tiempo en milisegundos"""
+    plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return plan, statistics.median(timings)
+
+def run_all(conn, params):
+    results = {}
+    for name, sql in QUERIES.items():
+        results[name] = measure(conn, sql, params)
+    return results
+
+def main():
+    num_videos = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(prefix='bench_queries_'), 'bench.db')
+    num_users = max(num_videos // 100, 1)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        print(f"🗄️  Generando {num_videos} videos, {num_videos * 3} clips y {num_users} usuarios en {path}...")
+        start = time.perf_counter()
+        seed(conn, num_videos, num_users)
+        conn.execute("ANALYZE")
+        print(f"   Datos listos en {time.perf_counter() - start:.1f}s")
+
+        params = {'user_id': num_users // 2, 'week_ago': datetime.utcnow() - timedelta(days=7)}
+        before = run_all(conn, params)
+
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        after = run_all(conn, params)
+
+        for name in QUERIES:
+            (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+            print(f"\n⏱️  {name}: {ms_before:9.2f} ms → {ms_after:8.2f} ms")
+            print(f"   antes:   {' | '.join(plan_before)}")
+            print(f"   después: {' | '.join(plan_after)}")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""stat counters
+
+Revision ID: 3c7e6d6f7a42
+Revises: 5ad72d5a0508
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e6d6f7a42'
+down_revision = '5ad72d5a0508'
+branch_labels = None
+depends_on = None
+
+# Contadores iniciales calculados una sola vez desde las tablas
+BACKFILL = (
+    ("SELECT 'users', count(*) FROM \"user\""),
+    ("SELECT 'videos', count(*) FROM video"),
+    ("SELECT 'clips', count(*) FROM clip"),
+    ("SELECT 'users.plan.' || plan, count(*) FROM \"user\" GROUP BY plan"),
+    ("SELECT 'videos.status.' || status, count(*) FROM video GROUP BY status"),
+    ("SELECT 'users.day.' || CAST(date(created_at) AS VARCHAR), count(*) FROM \"user\" "
+     "WHERE created_at IS NOT NULL GROUP BY date(created_at)"),
+    ("SELECT 'videos.day.' || CAST(date(created_at) AS VARCHAR), count(*) FROM video "
+     "WHERE created_at IS NOT NULL GROUP BY date(created_at)"),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = (
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True)
+    )
+    # db.create_all() pudo haber creado la tabla vacía al arrancar
+    if 'stat_counter' in sa.inspect(bind).get_table_names():
+        stat_counter = sa.table('stat_counter', sa.column('name'), sa.column('value'), sa.column('updated_at'))
+        if bind.execute(sa.text('SELECT count(*) FROM stat_counter')).scalar():
+            return
+    else:
+        stat_counter = op.create_table('stat_counter', *columns, sa.PrimaryKeyConstraint('name'))
+
+    now = datetime.utcnow()
+    rows = []
+    for sql in BACKFILL:
+        for name, value in bind.execute(sa.text(sql)):
+            if name is not None:
+                rows.append({'name': name, 'value': value, 'updated_at': now})
+    if rows:
+        op.bulk_insert(stat_counter, rows)
+
+
+def downgrade():
+    op.drop_table('stat_counter')
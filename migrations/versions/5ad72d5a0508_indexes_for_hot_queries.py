@@ -0,0 +1,44 @@
+"""indexes for hot queries
+
+Revision ID: 5ad72d5a0508
+Revises: 8f8a68204475
+Create Date: 2026-10-17 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5ad72d5a0508'
+down_revision = '8f8a68204475'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas)
+INDEXES = (
+    # Cuota semanal (user_id = ? AND created_at >= ?) y listas por usuario ordenadas por fecha
+    ('ix_video_user_id_created_at', 'video', ['user_id', 'created_at']),
+    # Listas de admin ordenadas por fecha y conteos por estado
+    ('ix_video_created_at', 'video', ['created_at']),
+    ('ix_video_status', 'video', ['status']),
+    # /videos/clips (join por video) y el conteo de clips de cada video
+    ('ix_clip_video_id', 'clip', ['video_id']),
+    ('ix_user_created_at', 'user', ['created_at']),
+    # Reclamo de trabajos y heartbeat de cada worker
+    ('ix_processing_job_status', 'processing_job', ['status']),
+    ('ix_processing_job_worker_id', 'processing_job', ['worker_id']),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
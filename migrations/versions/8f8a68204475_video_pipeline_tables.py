@@ -0,0 +1,109 @@
+"""video pipeline tables and columns
+
+Revision ID: 8f8a68204475
+Revises: e565f49ac9b2
+Create Date: 2026-10-17 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f8a68204475'
+down_revision = 'e565f49ac9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() ya pudo haber creado las tablas nuevas, pero nunca
+    # agrega columnas a tablas existentes
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    video_columns = {c['name'] for c in inspector.get_columns('video')}
+    if 'updated_at' not in video_columns:
+        op.add_column('video', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    clip_columns = {c['name'] for c in inspector.get_columns('clip')}
+    for name in ('sprite_path', 'preview_path', 'subtitles_path'):
+        if name not in clip_columns:
+            op.add_column('clip', sa.Column(name, sa.String(length=500), nullable=True))
+
+    if 'processing_job' not in tables:
+        op.create_table('processing_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('video_url', sa.String(length=500), nullable=False),
+        sa.Column('encode_profile', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=True),
+        sa.Column('stage', sa.String(length=20), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=True),
+        sa.Column('bytes_downloaded', sa.BigInteger(), nullable=True),
+        sa.Column('bytes_saved', sa.BigInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('video_id')
+        )
+    else:
+        job_columns = {c['name'] for c in inspector.get_columns('processing_job')}
+        for column in (
+            sa.Column('encode_profile', sa.String(length=50), nullable=True),
+            sa.Column('cancel_requested', sa.Boolean(), nullable=True),
+            sa.Column('stage', sa.String(length=20), nullable=True),
+            sa.Column('progress', sa.Float(), nullable=True),
+            sa.Column('bytes_downloaded', sa.BigInteger(), nullable=True),
+            sa.Column('bytes_saved', sa.BigInteger(), nullable=True)
+        ):
+            if column.name not in job_columns:
+                op.add_column('processing_job', column)
+
+    if 'video_info_cache' not in tables:
+        op.create_table('video_info_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('youtube_id', sa.String(length=20), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.Column('success', sa.Boolean(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_video_info_cache_youtube_id', 'video_info_cache', ['youtube_id'], unique=True)
+
+    if 'transcript' not in tables:
+        op.create_table('transcript',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('youtube_id', sa.String(length=20), nullable=False),
+        sa.Column('backend', sa.String(length=20), nullable=True),
+        sa.Column('segments', sa.Text(), nullable=False),
+        sa.Column('covered', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_transcript_youtube_id', 'transcript', ['youtube_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_transcript_youtube_id', table_name='transcript')
+    op.drop_table('transcript')
+    op.drop_index('ix_video_info_cache_youtube_id', table_name='video_info_cache')
+    op.drop_table('video_info_cache')
+    op.drop_table('processing_job')
+    with op.batch_alter_table('clip') as batch_op:
+        batch_op.drop_column('subtitles_path')
+        batch_op.drop_column('preview_path')
+        batch_op.drop_column('sprite_path')
+    with op.batch_alter_table('video') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,63 @@
+"""daily rollups
+
+Revision ID: c44f22d15985
+Revises: 3c7e6d6f7a42
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c44f22d15985'
+down_revision = '3c7e6d6f7a42'
+branch_labels = None
+depends_on = None
+
+# Rangos por fecha que recorre el recálculo de cada día
+INDEXES = (
+    ('ix_clip_created_at', 'clip', ['created_at']),
+    ('ix_processing_job_updated_at', 'processing_job', ['updated_at']),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    # db.create_all() pudo haber creado la tabla y la columna al arrancar
+    if 'daily_rollup' not in tables:
+        op.create_table('daily_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('plan', sa.String(length=20), nullable=False),
+        sa.Column('signups', sa.Integer(), nullable=True),
+        sa.Column('submissions', sa.Integer(), nullable=True),
+        sa.Column('completions', sa.Integer(), nullable=True),
+        sa.Column('failures', sa.Integer(), nullable=True),
+        sa.Column('clips', sa.Integer(), nullable=True),
+        sa.Column('processing_seconds', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'plan', name='uq_daily_rollup_day_plan')
+        )
+        op.create_index('ix_daily_rollup_day', 'daily_rollup', ['day'], unique=False)
+
+    job_columns = {column['name'] for column in inspector.get_columns('processing_job')}
+    if 'started_at' not in job_columns:
+        op.add_column('processing_job', sa.Column('started_at', sa.DateTime(), nullable=True))
+
+    for name, table, columns in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    with op.batch_alter_table('processing_job', schema=None) as batch_op:
+        batch_op.drop_column('started_at')
+    op.drop_index('ix_daily_rollup_day', table_name='daily_rollup')
+    op.drop_table('daily_rollup')
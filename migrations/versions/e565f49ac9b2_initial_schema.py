@@ -0,0 +1,65 @@
+"""initial schema
+
+Revision ID: e565f49ac9b2
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e565f49ac9b2'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases existentes se crearon con db.create_all(): sólo crear lo que falte
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'user' not in tables:
+        op.create_table('user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('plan', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+        )
+
+    if 'video' not in tables:
+        op.create_table('video',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('youtube_url', sa.String(length=500), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'clip' not in tables:
+        op.create_table('clip',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=True),
+        sa.Column('thumbnail_path', sa.String(length=500), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('start_time', sa.Float(), nullable=True),
+        sa.Column('end_time', sa.Float(), nullable=True),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('clip')
+    op.drop_table('video')
+    op.drop_table('user')
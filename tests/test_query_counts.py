@@ -0,0 +1,93 @@
+"""Cantidad de consultas SQL por página de las listas de videos
+
+Una página debe costar las mismas consultas sin importar cuántos videos,
+clips o dueños distintos tenga (sin N+1).
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+_db_dir = tempfile.mkdtemp(prefix='query_counts_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+from app import create_app, db
+from app.models import User, Video, Clip
+from flask_jwt_extended import create_access_token
+
+ADMIN_EMAIL = 'admin@ai-net.com'
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+def seed(app, num_users, videos_per_user, clips_per_video=3):
+    """Usuarios con sus videos y clips; devuelve el token del primer usuario y el del admin"""
+    with app.app_context():
+        admin = User(email=ADMIN_EMAIL, password='x')
+        db.session.add(admin)
+        users = [User(email=f'user{i}@example.com', password='x') for i in range(num_users)]
+        db.session.add_all(users)
+        db.session.flush()
+
+        for user in users:
+            for i in range(videos_per_user):
+                video = Video(user_id=user.id, youtube_url=f'https://youtu.be/{user.id}_{i}', status='completed')
+                db.session.add(video)
+                db.session.flush()
+                db.session.add_all(
+                    Clip(video_id=video.id, file_path=f'clip_{video.id}_{n}.mp4', duration=30.0)
+                    for n in range(clips_per_video)
+                )
+        db.session.commit()
+        return create_access_token(identity=str(users[0].id)), create_access_token(identity=str(admin.id))
+
+@contextmanager
+def count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def page_queries(app, path, token):
+    client = app.test_client()
+    with count_queries(app) as statements:
+        response = client.get(path, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.get_json()
+    return len(statements), response.get_json()
+
+@pytest.mark.parametrize('path, key', [('/videos/list', 'videos'), ('/admin/videos', 'videos')])
+def test_page_queries_do_not_grow_with_rows(app, path, key):
+    user_token, admin_token = seed(app, num_users=3, videos_per_user=2)
+    token = admin_token if path.startswith('/admin') else user_token
+    small, small_body = page_queries(app, path, token)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    user_token, admin_token = seed(app, num_users=10, videos_per_user=4, clips_per_video=5)
+    token = admin_token if path.startswith('/admin') else user_token
+    large, large_body = page_queries(app, path, token)
+
+    assert len(large_body[key]) > len(small_body[key])
+    assert large == small
+    assert all(video['clips_count'] == 5 for video in large_body[key])
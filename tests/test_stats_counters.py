@@ -0,0 +1,93 @@
+"""Contadores incrementales de /admin/stats frente a stats.rebuild()
+
+Un trabajo real de la cola cambia el estado del video en varios commits;
+los contadores mantenidos en cada flush deben terminar igual que los
+recalculados desde las tablas.
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix='stats_counters_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+from app import create_app, db
+from app.admin import stats
+from app.models import User, Video, Clip, StatCounter, VideoInfoCache
+from app.videos import media_cache
+from app.videos.jobs import JobQueue, enqueue_job
+from app.videos.video_routes import DOWNLOAD_FORMAT, plan_clips
+
+YOUTUBE_ID = 'dQw4w9WgXcQ'
+DURATION = 120
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['MEDIA_CACHE_DIR'] = str(tmp_path / 'cache')
+    app.config['CLIP_PLANNER'] = 'uniform'
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+def cache_video(app, tmp_path):
+    """Metadatos y clips ya cacheados: el trabajo termina sin red ni ffmpeg"""
+    windows = plan_clips(DURATION)
+    plan_fingerprint = media_cache.fingerprint(
+        DOWNLOAD_FORMAT,
+        windows,
+        app.config['CLIP_EXTRACTION_MODE'],
+        app.config['DOWNLOAD_MODE'],
+        app.config['CLIP_PLANNER'],
+        app.config['CLIP_PLANNER_SCENES']
+    )
+
+    clips = []
+    for i, (start_time, end_time) in enumerate(windows):
+        path = tmp_path / f'source_clip_{i}.mp4'
+        path.write_bytes(b'clip')
+        clips.append(Clip(file_path=str(path), duration=end_time - start_time,
+                          start_time=start_time, end_time=end_time))
+    media_cache.store_clip_set(YOUTUBE_ID, plan_fingerprint, clips)
+
+    info = {'title': 'Video', 'duration': DURATION, 'thumbnail': '', 'success': True}
+    db.session.add(VideoInfoCache(
+        youtube_id=YOUTUBE_ID, data=json.dumps(info), success=True,
+        expires_at=datetime.utcnow() + timedelta(days=1)
+    ))
+    db.session.commit()
+
+def counters():
+    return {row.name: row.value for row in StatCounter.query.all() if row.value}
+
+def test_job_counters_match_rebuild(app, tmp_path):
+    with app.app_context():
+        cache_video(app, tmp_path)
+        user = User(email='user@example.com', password='x')
+        db.session.add(user)
+        db.session.flush()
+        video = Video(user_id=user.id, youtube_url=f'https://youtu.be/{YOUTUBE_ID}', status='queued')
+        db.session.add(video)
+        db.session.flush()
+        enqueue_job(video, video.youtube_url)
+        db.session.commit()
+        video_id = video.id
+
+    assert JobQueue(app, workers=1).run_once()
+
+    with app.app_context():
+        assert db.session.get(Video, video_id).status == 'completed'
+        incremental = counters()
+        stats.rebuild()
+        assert incremental == counters()
+        assert incremental['videos.status.completed'] == 1
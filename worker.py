@@ -0,0 +1,14 @@
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.videos.jobs import JobQueue
+
+app = create_app()
+
+if __name__ == '__main__':
+    queue = JobQueue(app)
+    app.extensions['job_queue'] = queue
+    print(f"Worker {queue.worker_id} procesando con {queue.workers} hilos")
+    queue.run_forever()
@@ -1,10 +1,16 @@
 import os
 from dotenv import load_dotenv
 from app import create_app
+from app.videos.jobs import start_job_queue
 
 load_dotenv()
 
 app = create_app()
 
+# Pool de trabajos embebido sólo al servir la app (gunicorn o python wsgi.py),
+# no cuando un comando `flask --app wsgi ...` importa este módulo
+if app.config['EMBEDDED_WORKERS'] and not os.environ.get('FLASK_RUN_FROM_CLI'):
+    start_job_queue(app)
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file